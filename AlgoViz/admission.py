@@ -0,0 +1,199 @@
+"""Admission control for the step-generating API routes
+
+A request weighs its registry step estimate // ADMISSION_STEP_UNIT, taken for
+the variant it will be served by (standard recursion steps are priced in
+copied stack frames, so deep traces weigh far more than event logs). Weightless
+(preset-sized) requests always pass; heavier ones take that many tokens from
+their client's bucket (keyed on request.remote_addr, the real client address
+behind ProxyFix) and must fit under MAX_CONCURRENT_COST, the total weight in
+flight across workers, or get 429 with Retry-After. Requests heavier than
+the burst or the concurrency cap could never be admitted and get 413.
+Wrapped inside stored_trace, so cached traces are never throttled.
+
+In-flight weights live in a shared-memory table created at import, which
+gunicorn's preload_app hands to every worker; slots record the worker pid so
+a killed worker cannot leak capacity. Token buckets are per worker.
+"""
+import functools
+import math
+import multiprocessing
+import os
+import threading
+import time
+
+from flask import jsonify, request
+from app import app
+from registry import lookup, recursion_variant
+
+MAX_TRACKED_CLIENTS = 10_000
+
+def int_arg(value):
+    return int(value) if str(value).isdigit() else 0
+
+def count_items(value):
+    return value.count(',') + 1 if value else 0
+
+def request_size(category):
+    """Input size of the current request, without fully parsing it"""
+    if request.method == 'POST':
+        if request.mimetype == 'application/octet-stream':
+            record_size = 4 if category == 'sorting' else 8
+            return (request.content_length or 0) // record_size
+        payload = request.get_json(silent=True)  # cached for the view
+        if isinstance(payload, list):
+            return len(payload)
+        if not isinstance(payload, dict):
+            return 0
+        if category == 'graphs':
+            edges = payload.get('edges')
+            return int_arg(payload.get('nodes', 0)) + (len(edges) if isinstance(edges, list) else 0)
+        if 'generate' in payload:
+            return int_arg(payload.get('size', 8))
+        data = payload.get('data')
+        return len(data) if isinstance(data, list) else 0
+
+    args = request.args
+    if category == 'sorting':
+        if 'generate' in args:
+            return int_arg(args.get('size', 8))
+        return count_items(args.get('data', '64,34,25,12,22,11,90'))
+    if category == 'trees':
+        return count_items(args.get('tree', '1,2,3,4,5,6,7'))
+    if category == 'recursion':
+        return len(args['text']) if 'text' in args else int_arg(args.get('n', 5))
+    return int_arg(args.get('nodes', 4)) + count_items(args.get('edges', '0-1,0-2,1-3,2-3'))
+
+def request_weight(category, name):
+    """Admission weight of the current request; 0 means exempt"""
+    entry = lookup(category, name)
+    if entry is None:
+        return 0  # the view answers 400
+    size = request_size(category)
+    variant = recursion_variant(entry, size, request.args) if category == 'recursion' else None
+    return entry.estimate_steps(size, variant) // app.config['ADMISSION_STEP_UNIT']
+
+class TokenBuckets:
+    """Per-client token buckets"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, client, tokens, rate, burst):
+        """Take tokens from a client's bucket; returns seconds to wait, 0 on success"""
+        now = time.monotonic()
+        with self._lock:
+            level, stamp = self._buckets.get(client, (burst, now))
+            level = min(burst, level + (now - stamp) * rate)
+            if level < tokens:
+                self._buckets[client] = (level, now)
+                return (tokens - level) / rate
+            self._buckets[client] = (level - tokens, now)
+            if len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._prune(now, rate, burst)
+        return 0
+
+    def give_back(self, client, tokens):
+        with self._lock:
+            level, stamp = self._buckets[client]
+            self._buckets[client] = (level + tokens, stamp)
+
+    def _prune(self, now, rate, burst):
+        # Clients whose buckets have refilled are indistinguishable from new ones
+        for client, (level, stamp) in list(self._buckets.items()):
+            if level + (now - stamp) * rate >= burst:
+                del self._buckets[client]
+
+class ConcurrencyLimit:
+    """Weighted cap on concurrent generations, shared by forked workers"""
+
+    def __init__(self, slots):
+        # (pid, weight) pairs; pid 0 marks a free slot
+        self._slots = multiprocessing.Array('q', 2 * max(slots, 1))
+
+    def acquire(self, weight, capacity):
+        """Reserve weight; returns a slot index, or None when over capacity"""
+        slots = self._slots
+        pid = os.getpid()
+        with slots.get_lock():
+            in_flight = 0
+            free = None
+            for index in range(0, len(slots), 2):
+                owner = slots[index]
+                if owner and owner != pid and not process_alive(owner):
+                    slots[index] = slots[index + 1] = 0
+                    owner = 0
+                if owner:
+                    in_flight += slots[index + 1]
+                elif free is None:
+                    free = index
+            if free is None or in_flight + weight > capacity:
+                return None
+            slots[free], slots[free + 1] = pid, weight
+        return free
+
+    def release(self, slot):
+        with self._slots.get_lock():
+            self._slots[slot] = self._slots[slot + 1] = 0
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+client_buckets = TokenBuckets()
+concurrency_limit = ConcurrencyLimit(app.config['MAX_CONCURRENT_COST'])
+
+def max_request_weight():
+    """Heaviest request the enabled limits can ever admit"""
+    limits = []
+    if app.config['RATE_LIMIT_PER_SECOND'] > 0:
+        limits.append(app.config['RATE_LIMIT_BURST'])
+    if app.config['MAX_CONCURRENT_COST'] > 0:
+        limits.append(app.config['MAX_CONCURRENT_COST'])
+    return min(limits, default=math.inf)
+
+def too_many_requests(retry_after, message):
+    response = jsonify({'error': message})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+def admitted(category, name_arg='algorithm'):
+    """Apply rate and concurrency limits to a step-generating view"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            weight = request_weight(category, kwargs.get(name_arg))
+            if not weight:
+                return view(*args, **kwargs)
+            if weight > max_request_weight():
+                return jsonify({'error': 'Input too large for this server'}), 413
+
+            rate = app.config['RATE_LIMIT_PER_SECOND']
+            client = request.remote_addr
+            tokens = 0
+            if rate > 0:
+                tokens = weight
+                wait = client_buckets.take(client, tokens, rate, app.config['RATE_LIMIT_BURST'])
+                if wait:
+                    return too_many_requests(wait, 'Rate limit exceeded')
+
+            capacity = app.config['MAX_CONCURRENT_COST']
+            if capacity <= 0:
+                return view(*args, **kwargs)
+            slot = concurrency_limit.acquire(weight, capacity)
+            if slot is None:
+                if tokens:
+                    client_buckets.give_back(client, tokens)
+                return too_many_requests(1, 'Server busy, try again shortly')
+            try:
+                return view(*args, **kwargs)
+            finally:
+                concurrency_limit.release(slot)
+        return wrapper
+    return decorator
@@ -1,33 +1,90 @@
-from collections import deque, defaultdict
+import heapq
+import math
+import random
+from array import array
+from collections import deque
 
 # Sorting Algorithms
 
-def bubble_sort_steps(arr):
+SORT_DETAIL_LEVELS = ('full', 'swaps', 'coarse', 'pass')
+MUTATING_STEP_TYPES = frozenset({
+    'swap', 'shift', 'insert', 'merge_step', 'pivot_place', 'extract', 'write'
+})
+
+def sort_step_filter(detail, n):
+    """Return keep(step_type), deciding whether a sorting step is built at all
+
+    Generators check keep() before building a step, so suppressed steps cost
+    neither an array copy nor a description string. Levels:
+
+    - 'full': every step (the default)
+    - 'swaps': only steps that mutate the array
+    - 'coarse': every n-th mutating step, i.e. about one frame per array's
+      worth of element moves
+    - 'pass': one 'pass' snapshot per outer pass, partition or merge level
+
+    The final 'complete' step is always emitted.
+    """
+    if detail not in SORT_DETAIL_LEVELS:
+        raise ValueError(f'Unknown detail level: {detail}')
+    if detail == 'full':
+        return lambda step_type: step_type != 'pass'
+    if detail == 'swaps':
+        return lambda step_type: step_type in MUTATING_STEP_TYPES
+    if detail == 'pass':
+        return lambda step_type: step_type == 'pass'
+    
+    stride = max(1, n)
+    mutations = 0
+    
+    def keep(step_type):
+        nonlocal mutations
+        if step_type not in MUTATING_STEP_TYPES:
+            return False
+        mutations += 1
+        return mutations % stride == 0
+    
+    return keep
+
+def bubble_sort_steps(arr, detail='full'):
     """Generate step-by-step bubble sort visualization data"""
     steps = []
     n = len(arr)
+    keep = sort_step_filter(detail, n)
     
     for i in range(n):
         for j in range(0, n - i - 1):
             # Compare step
-            steps.append({
-                'type': 'compare',
-                'array': arr.copy(),
-                'comparing': [j, j + 1],
-                'pseudocode_line': 'if arr[j] > arr[j+1]:',
-                'description': f'Comparing {arr[j]} and {arr[j+1]}'
-            })
+            if keep('compare'):
+                steps.append({
+                    'type': 'compare',
+                    'array': arr.copy(),
+                    'comparing': [j, j + 1],
+                    'pseudocode_line': 'if arr[j] > arr[j+1]:',
+                    'description': f'Comparing {arr[j]} and {arr[j+1]}'
+                })
             
             if arr[j] > arr[j + 1]:
                 # Swap step
                 arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                steps.append({
-                    'type': 'swap',
-                    'array': arr.copy(),
-                    'swapped': [j, j + 1],
-                    'pseudocode_line': 'swap(arr[j], arr[j+1])',
-                    'description': f'Swapped {arr[j+1]} and {arr[j]}'
-                })
+                if keep('swap'):
+                    steps.append({
+                        'type': 'swap',
+                        'array': arr.copy(),
+                        'swapped': [j, j + 1],
+                        'pseudocode_line': 'swap(arr[j], arr[j+1])',
+                        'description': f'Swapped {arr[j+1]} and {arr[j]}'
+                    })
+        
+        if keep('pass'):
+            steps.append({
+                'type': 'pass',
+                'array': arr.copy(),
+                'pass': i,
+                'sorted_from': n - i - 1,
+                'pseudocode_line': f'for i = {i}',
+                'description': f'Pass {i + 1}: {arr[n - i - 1]} is in place'
+            })
     
     steps.append({
         'type': 'complete',
@@ -38,50 +95,64 @@ def bubble_sort_steps(arr):
     
     return steps
 
-def selection_sort_steps(arr):
+def selection_sort_steps(arr, detail='full'):
     """Generate step-by-step selection sort visualization data"""
     steps = []
     n = len(arr)
+    keep = sort_step_filter(detail, n)
     
     for i in range(n):
         min_idx = i
         
-        steps.append({
-            'type': 'select_min',
-            'array': arr.copy(),
-            'current_min': min_idx,
-            'pseudocode_line': f'min_idx = {i}',
-            'description': f'Finding minimum from position {i}'
-        })
-        
-        for j in range(i + 1, n):
+        if keep('select_min'):
             steps.append({
-                'type': 'compare',
+                'type': 'select_min',
                 'array': arr.copy(),
-                'comparing': [min_idx, j],
                 'current_min': min_idx,
-                'pseudocode_line': 'if arr[j] < arr[min_idx]:',
-                'description': f'Comparing {arr[j]} with current minimum {arr[min_idx]}'
+                'pseudocode_line': f'min_idx = {i}',
+                'description': f'Finding minimum from position {i}'
             })
-            
-            if arr[j] < arr[min_idx]:
-                min_idx = j
+        
+        for j in range(i + 1, n):
+            if keep('compare'):
                 steps.append({
-                    'type': 'new_min',
+                    'type': 'compare',
                     'array': arr.copy(),
+                    'comparing': [min_idx, j],
                     'current_min': min_idx,
-                    'pseudocode_line': f'min_idx = {j}',
-                    'description': f'New minimum found: {arr[min_idx]}'
+                    'pseudocode_line': 'if arr[j] < arr[min_idx]:',
+                    'description': f'Comparing {arr[j]} with current minimum {arr[min_idx]}'
                 })
+            
+            if arr[j] < arr[min_idx]:
+                min_idx = j
+                if keep('new_min'):
+                    steps.append({
+                        'type': 'new_min',
+                        'array': arr.copy(),
+                        'current_min': min_idx,
+                        'pseudocode_line': f'min_idx = {j}',
+                        'description': f'New minimum found: {arr[min_idx]}'
+                    })
         
         if min_idx != i:
             arr[i], arr[min_idx] = arr[min_idx], arr[i]
+            if keep('swap'):
+                steps.append({
+                    'type': 'swap',
+                    'array': arr.copy(),
+                    'swapped': [i, min_idx],
+                    'pseudocode_line': 'swap(arr[i], arr[min_idx])',
+                    'description': f'Swapped {arr[i]} with {arr[min_idx]}'
+                })
+        
+        if keep('pass'):
             steps.append({
-                'type': 'swap',
+                'type': 'pass',
                 'array': arr.copy(),
-                'swapped': [i, min_idx],
-                'pseudocode_line': 'swap(arr[i], arr[min_idx])',
-                'description': f'Swapped {arr[i]} with {arr[min_idx]}'
+                'pass': i,
+                'pseudocode_line': f'for i = {i}',
+                'description': f'Pass {i + 1}: {arr[i]} is in place'
             })
     
     steps.append({
@@ -93,53 +164,67 @@ def selection_sort_steps(arr):
     
     return steps
 
-def insertion_sort_steps(arr):
+def insertion_sort_steps(arr, detail='full'):
     """Generate step-by-step insertion sort visualization data"""
     steps = []
+    keep = sort_step_filter(detail, len(arr))
     
     for i in range(1, len(arr)):
         key = arr[i]
         j = i - 1
         
-        steps.append({
-            'type': 'select_key',
-            'array': arr.copy(),
-            'key_index': i,
-            'key_value': key,
-            'pseudocode_line': f'key = arr[{i}] = {key}',
-            'description': f'Inserting {key} into sorted portion'
-        })
-        
-        while j >= 0 and arr[j] > key:
+        if keep('select_key'):
             steps.append({
-                'type': 'compare',
+                'type': 'select_key',
                 'array': arr.copy(),
-                'comparing': [j, i],
+                'key_index': i,
                 'key_value': key,
-                'pseudocode_line': f'arr[{j}] > key',
-                'description': f'{arr[j]} > {key}, shifting right'
+                'pseudocode_line': f'key = arr[{i}] = {key}',
+                'description': f'Inserting {key} into sorted portion'
             })
+        
+        while j >= 0 and arr[j] > key:
+            if keep('compare'):
+                steps.append({
+                    'type': 'compare',
+                    'array': arr.copy(),
+                    'comparing': [j, i],
+                    'key_value': key,
+                    'pseudocode_line': f'arr[{j}] > key',
+                    'description': f'{arr[j]} > {key}, shifting right'
+                })
             
             arr[j + 1] = arr[j]
+            if keep('shift'):
+                steps.append({
+                    'type': 'shift',
+                    'array': arr.copy(),
+                    'shifted': j + 1,
+                    'key_value': key,
+                    'pseudocode_line': f'arr[{j+1}] = arr[{j}]',
+                    'description': f'Shifted {arr[j+1]} to position {j+1}'
+                })
+            j -= 1
+        
+        arr[j + 1] = key
+        if keep('insert'):
             steps.append({
-                'type': 'shift',
+                'type': 'insert',
                 'array': arr.copy(),
-                'shifted': j + 1,
+                'inserted': j + 1,
                 'key_value': key,
-                'pseudocode_line': f'arr[{j+1}] = arr[{j}]',
-                'description': f'Shifted {arr[j+1]} to position {j+1}'
+                'pseudocode_line': f'arr[{j+1}] = key',
+                'description': f'Inserted {key} at position {j+1}'
             })
-            j -= 1
         
-        arr[j + 1] = key
-        steps.append({
-            'type': 'insert',
-            'array': arr.copy(),
-            'inserted': j + 1,
-            'key_value': key,
-            'pseudocode_line': f'arr[{j+1}] = key',
-            'description': f'Inserted {key} at position {j+1}'
-        })
+        if keep('pass'):
+            steps.append({
+                'type': 'pass',
+                'array': arr.copy(),
+                'pass': i,
+                'pseudocode_line': f'for i = {i}',
+                'description': f'Pass {i}: first {i + 1} elements sorted'
+            })
     
     steps.append({
         'type': 'complete',
@@ -150,24 +235,26 @@ def insertion_sort_steps(arr):
     
     return steps
 
-def merge_sort_steps(arr):
+def merge_sort_steps(arr, detail='full'):
     """Generate step-by-step merge sort visualization data"""
     steps = []
+    keep = sort_step_filter(detail, len(arr))
     
     def merge_sort_recursive(arr, left, right, level=0):
         if left < right:
             mid = (left + right) // 2
             
-            steps.append({
-                'type': 'divide',
-                'array': arr.copy(),
-                'left': left,
-                'right': right,
-                'mid': mid,
-                'level': level,
-                'pseudocode_line': f'divide: [{left}...{mid}] and [{mid+1}...{right}]',
-                'description': f'Dividing array at position {mid}'
-            })
+            if keep('divide'):
+                steps.append({
+                    'type': 'divide',
+                    'array': arr.copy(),
+                    'left': left,
+                    'right': right,
+                    'mid': mid,
+                    'level': level,
+                    'pseudocode_line': f'divide: [{left}...{mid}] and [{mid+1}...{right}]',
+                    'description': f'Dividing array at position {mid}'
+                })
             
             merge_sort_recursive(arr, left, mid, level + 1)
             merge_sort_recursive(arr, mid + 1, right, level + 1)
@@ -177,18 +264,19 @@ def merge_sort_steps(arr):
         left_arr = arr[left:mid + 1]
         right_arr = arr[mid + 1:right + 1]
         
-        steps.append({
-            'type': 'merge_start',
-            'array': arr.copy(),
-            'left': left,
-            'right': right,
-            'mid': mid,
-            'level': level,
-            'left_subarray': left_arr,
-            'right_subarray': right_arr,
-            'pseudocode_line': 'merge(left_arr, right_arr)',
-            'description': f'Merging subarrays {left_arr} and {right_arr}'
-        })
+        if keep('merge_start'):
+            steps.append({
+                'type': 'merge_start',
+                'array': arr.copy(),
+                'left': left,
+                'right': right,
+                'mid': mid,
+                'level': level,
+                'left_subarray': left_arr,
+                'right_subarray': right_arr,
+                'pseudocode_line': 'merge(left_arr, right_arr)',
+                'description': f'Merging subarrays {left_arr} and {right_arr}'
+            })
         
         i = j = 0
         k = left
@@ -201,41 +289,55 @@ def merge_sort_steps(arr):
                 arr[k] = right_arr[j]
                 j += 1
             
-            steps.append({
-                'type': 'merge_step',
-                'array': arr.copy(),
-                'merged_index': k,
-                'level': level,
-                'pseudocode_line': f'arr[{k}] = {arr[k]}',
-                'description': f'Placed {arr[k]} at position {k}'
-            })
+            if keep('merge_step'):
+                steps.append({
+                    'type': 'merge_step',
+                    'array': arr.copy(),
+                    'merged_index': k,
+                    'level': level,
+                    'pseudocode_line': f'arr[{k}] = {arr[k]}',
+                    'description': f'Placed {arr[k]} at position {k}'
+                })
             k += 1
         
         while i < len(left_arr):
             arr[k] = left_arr[i]
-            steps.append({
-                'type': 'merge_step',
-                'array': arr.copy(),
-                'merged_index': k,
-                'level': level,
-                'pseudocode_line': f'arr[{k}] = {arr[k]}',
-                'description': f'Copied remaining {arr[k]} to position {k}'
-            })
+            if keep('merge_step'):
+                steps.append({
+                    'type': 'merge_step',
+                    'array': arr.copy(),
+                    'merged_index': k,
+                    'level': level,
+                    'pseudocode_line': f'arr[{k}] = {arr[k]}',
+                    'description': f'Copied remaining {arr[k]} to position {k}'
+                })
             i += 1
             k += 1
         
         while j < len(right_arr):
             arr[k] = right_arr[j]
+            if keep('merge_step'):
+                steps.append({
+                    'type': 'merge_step',
+                    'array': arr.copy(),
+                    'merged_index': k,
+                    'level': level,
+                    'pseudocode_line': f'arr[{k}] = {arr[k]}',
+                    'description': f'Copied remaining {arr[k]} to position {k}'
+                })
+            j += 1
+            k += 1
+        
+        if keep('pass'):
             steps.append({
-                'type': 'merge_step',
+                'type': 'pass',
                 'array': arr.copy(),
-                'merged_index': k,
+                'left': left,
+                'right': right,
                 'level': level,
-                'pseudocode_line': f'arr[{k}] = {arr[k]}',
-                'description': f'Copied remaining {arr[k]} to position {k}'
+                'pseudocode_line': f'merge(arr, {left}, {mid}, {right})',
+                'description': f'Merged positions {left} to {right}'
             })
-            j += 1
-            k += 1
     
     merge_sort_recursive(arr, 0, len(arr) - 1)
     
@@ -248,91 +350,698 @@ def merge_sort_steps(arr):
     
     return steps
 
-def quick_sort_steps(arr):
-    """Generate step-by-step quick sort visualization data"""
+def merge_sort_bottom_up_steps(arr, detail='full'):
+    """Generate step-by-step bottom-up (iterative) merge sort visualization data
+
+    Runs of width 1, 2, 4, ... are merged pass by pass through a single
+    auxiliary buffer allocated once up front. merge_start steps reference
+    the subarrays by their bounds (left, mid, right) rather than copying
+    their contents.
+    """
     steps = []
+    n = len(arr)
+    keep = sort_step_filter(detail, n)
+    aux = [0] * n
+    width = 1
+    level = 0
     
-    def quick_sort_recursive(arr, low, high, level=0):
-        if low < high:
-            pi = partition(arr, low, high, level)
-            quick_sort_recursive(arr, low, pi - 1, level + 1)
-            quick_sort_recursive(arr, pi + 1, high, level + 1)
+    while width < n:
+        for left in range(0, n - width, 2 * width):
+            mid = left + width - 1
+            right = min(left + 2 * width - 1, n - 1)
+            
+            if keep('merge_start'):
+                steps.append({
+                    'type': 'merge_start',
+                    'array': arr.copy(),
+                    'left': left,
+                    'right': right,
+                    'mid': mid,
+                    'level': level,
+                    'width': width,
+                    'pseudocode_line': 'merge(left_arr, right_arr)',
+                    'description': f'Merging [{left}...{mid}] and [{mid+1}...{right}]'
+                })
+            
+            for k in range(left, right + 1):
+                aux[k] = arr[k]
+            
+            i, j = left, mid + 1
+            for k in range(left, right + 1):
+                remaining = i > mid or j > right
+                if i > mid:
+                    arr[k] = aux[j]
+                    j += 1
+                elif j > right:
+                    arr[k] = aux[i]
+                    i += 1
+                elif aux[i] <= aux[j]:
+                    arr[k] = aux[i]
+                    i += 1
+                else:
+                    arr[k] = aux[j]
+                    j += 1
+                
+                if keep('merge_step'):
+                    steps.append({
+                        'type': 'merge_step',
+                        'array': arr.copy(),
+                        'merged_index': k,
+                        'level': level,
+                        'pseudocode_line': f'arr[{k}] = {arr[k]}',
+                        'description': (f'Copied remaining {arr[k]} to position {k}' if remaining
+                                        else f'Placed {arr[k]} at position {k}')
+                    })
+        
+        if keep('pass'):
+            steps.append({
+                'type': 'pass',
+                'array': arr.copy(),
+                'level': level,
+                'width': width,
+                'pseudocode_line': f'width = {width}',
+                'description': f'Merged all runs of width {width}'
+            })
+        
+        width *= 2
+        level += 1
     
-    def partition(arr, low, high, level):
-        pivot = arr[high]
-        steps.append({
-            'type': 'select_pivot',
-            'array': arr.copy(),
-            'pivot_index': high,
-            'pivot_value': pivot,
-            'low': low,
-            'high': high,
-            'level': level,
-            'pseudocode_line': f'pivot = arr[{high}] = {pivot}',
-            'description': f'Selected pivot: {pivot}'
-        })
+    steps.append({
+        'type': 'complete',
+        'array': arr.copy(),
+        'pseudocode_line': 'return arr',
+        'description': 'Merge sort complete!'
+    })
+    
+    return steps
+
+QUICK_SORT_PIVOTS = ('last', 'median3', 'random', 'ninther')
+QUICK_SORT_PARTITIONS = ('lomuto', '3way')
+
+def quick_sort_steps(arr, pivot='last', partition_scheme='lomuto', seed=None, detail='full'):
+    """Generate step-by-step quick sort visualization data
+
+    pivot picks the pivot index: 'last' (arr[high]), 'median3' (median of
+    first, middle and last), 'random' (seeded for reproducible traces) or
+    'ninther' (median of three medians of three). partition_scheme '3way'
+    uses a Dutch national flag partition so runs of equal keys are settled
+    in one pass.
+
+    The engine is iterative and always handles the smaller partition first,
+    so the pending-range stack stays O(log n) deep on any input.
+    """
+    if pivot not in QUICK_SORT_PIVOTS:
+        raise ValueError(f'Unknown pivot strategy: {pivot}')
+    if partition_scheme not in QUICK_SORT_PARTITIONS:
+        raise ValueError(f'Unknown partition scheme: {partition_scheme}')
+    
+    steps = []
+    keep = sort_step_filter(detail, len(arr))
+    rng = random.Random(seed)
+    
+    def median_of_three(a, b, c):
+        if arr[a] < arr[b]:
+            if arr[b] < arr[c]:
+                return b
+            return c if arr[a] < arr[c] else a
+        if arr[a] < arr[c]:
+            return a
+        return c if arr[b] < arr[c] else b
+    
+    def choose_pivot(low, high):
+        if pivot == 'last':
+            return high
+        if pivot == 'random':
+            return rng.randint(low, high)
+        mid = (low + high) // 2
+        if pivot == 'ninther' and high - low >= 8:
+            eighth = (high - low) // 8
+            return median_of_three(
+                median_of_three(low, low + eighth, low + 2 * eighth),
+                median_of_three(mid - eighth, mid, mid + eighth),
+                median_of_three(high - 2 * eighth, high - eighth, high)
+            )
+        return median_of_three(low, mid, high)
+    
+    def partition(low, high, level):
+        """Lomuto partition around arr[high]; returns the pivot range"""
+        pivot_value = arr[high]
+        if keep('select_pivot'):
+            steps.append({
+                'type': 'select_pivot',
+                'array': arr.copy(),
+                'pivot_index': high,
+                'pivot_value': pivot_value,
+                'low': low,
+                'high': high,
+                'level': level,
+                'pseudocode_line': f'pivot = arr[{high}] = {pivot_value}',
+                'description': f'Selected pivot: {pivot_value}'
+            })
         
         i = low - 1
         
         for j in range(low, high):
+            if keep('compare'):
+                steps.append({
+                    'type': 'compare',
+                    'array': arr.copy(),
+                    'comparing': [j, high],
+                    'pivot_value': pivot_value,
+                    'level': level,
+                    'pseudocode_line': f'if arr[{j}] <= pivot:',
+                    'description': f'Comparing {arr[j]} with pivot {pivot_value}'
+                })
+            
+            if arr[j] <= pivot_value:
+                i += 1
+                if i != j:
+                    arr[i], arr[j] = arr[j], arr[i]
+                    if keep('swap'):
+                        steps.append({
+                            'type': 'swap',
+                            'array': arr.copy(),
+                            'swapped': [i, j],
+                            'pivot_value': pivot_value,
+                            'level': level,
+                            'pseudocode_line': f'swap(arr[{i}], arr[{j}])',
+                            'description': f'Swapped {arr[i]} and {arr[j]}'
+                        })
+        
+        arr[i + 1], arr[high] = arr[high], arr[i + 1]
+        if keep('pivot_place'):
             steps.append({
-                'type': 'compare',
+                'type': 'pivot_place',
                 'array': arr.copy(),
-                'comparing': [j, high],
-                'pivot_value': pivot,
+                'pivot_final_index': i + 1,
+                'pivot_value': pivot_value,
                 'level': level,
-                'pseudocode_line': f'if arr[{j}] <= pivot:',
-                'description': f'Comparing {arr[j]} with pivot {pivot}'
+                'pseudocode_line': f'place pivot at position {i + 1}',
+                'description': f'Placed pivot {pivot_value} at final position {i + 1}'
             })
+        
+        return i + 1, i + 1
+    
+    def partition_three_way(low, high, level):
+        """Dutch national flag partition around arr[high]; returns the pivot range"""
+        pivot_value = arr[high]
+        if keep('select_pivot'):
+            steps.append({
+                'type': 'select_pivot',
+                'array': arr.copy(),
+                'pivot_index': high,
+                'pivot_value': pivot_value,
+                'low': low,
+                'high': high,
+                'level': level,
+                'pseudocode_line': f'pivot = arr[{high}] = {pivot_value}',
+                'description': f'Selected pivot: {pivot_value}'
+            })
+        
+        lt, i, gt = low, low, high
+        while i <= gt:
+            if keep('compare'):
+                steps.append({
+                    'type': 'compare',
+                    'array': arr.copy(),
+                    'comparing': [i],
+                    'pivot_value': pivot_value,
+                    'level': level,
+                    'pseudocode_line': f'compare arr[{i}] with pivot',
+                    'description': f'Comparing {arr[i]} with pivot {pivot_value}'
+                })
             
-            if arr[j] <= pivot:
+            if arr[i] < pivot_value:
+                swap = (lt, i)
+                lt += 1
                 i += 1
-                if i != j:
-                    arr[i], arr[j] = arr[j], arr[i]
+            elif arr[i] > pivot_value:
+                swap = (i, gt)
+                gt -= 1
+            else:
+                i += 1
+                continue
+            
+            a, b = swap
+            if a != b:
+                arr[a], arr[b] = arr[b], arr[a]
+                if keep('swap'):
                     steps.append({
                         'type': 'swap',
                         'array': arr.copy(),
-                        'swapped': [i, j],
-                        'pivot_value': pivot,
+                        'swapped': [a, b],
+                        'pivot_value': pivot_value,
                         'level': level,
-                        'pseudocode_line': f'swap(arr[{i}], arr[{j}])',
-                        'description': f'Swapped {arr[i]} and {arr[j]}'
+                        'pseudocode_line': f'swap(arr[{a}], arr[{b}])',
+                        'description': f'Swapped {arr[a]} and {arr[b]}'
                     })
         
-        arr[i + 1], arr[high] = arr[high], arr[i + 1]
+        if keep('pivot_place'):
+            steps.append({
+                'type': 'pivot_place',
+                'array': arr.copy(),
+                'pivot_final_index': lt,
+                'equal_range': [lt, gt],
+                'pivot_value': pivot_value,
+                'level': level,
+                'pseudocode_line': f'arr[{lt}...{gt}] == pivot',
+                'description': f'Pivot {pivot_value} occupies final positions {lt} to {gt}'
+            })
+        
+        return lt, gt
+    
+    partition_range = partition_three_way if partition_scheme == '3way' else partition
+    pending = [(0, len(arr) - 1, 0)]
+    
+    while pending:
+        low, high, level = pending.pop()
+        if low >= high:
+            continue
+        
+        p = choose_pivot(low, high)
+        if p != high:
+            arr[p], arr[high] = arr[high], arr[p]
+            if keep('swap'):
+                steps.append({
+                    'type': 'swap',
+                    'array': arr.copy(),
+                    'swapped': [p, high],
+                    'level': level,
+                    'pseudocode_line': f'swap(arr[{p}], arr[{high}])',
+                    'description': f'Moved {pivot} pivot {arr[high]} to the end'
+                })
+        
+        first, last = partition_range(low, high, level)
+        if keep('pass'):
+            steps.append({
+                'type': 'pass',
+                'array': arr.copy(),
+                'low': low,
+                'high': high,
+                'level': level,
+                'pseudocode_line': f'partition(arr, {low}, {high})',
+                'description': f'Partitioned positions {low} to {high}'
+            })
+        
+        left, right = (low, first - 1, level + 1), (last + 1, high, level + 1)
+        # Push the larger side first so the smaller one is processed next
+        if first - low > high - last:
+            pending.extend([left, right])
+        else:
+            pending.extend([right, left])
+    
+    steps.append({
+        'type': 'complete',
+        'array': arr.copy(),
+        'pseudocode_line': 'return arr',
+        'description': 'Quick sort complete!'
+    })
+    
+    return steps
+
+def heap_sort_steps(arr, detail='full'):
+    """Generate step-by-step heap sort visualization data"""
+    steps = []
+    n = len(arr)
+    keep = sort_step_filter(detail, n)
+    
+    def sift_down(root, end, level):
+        """Sift arr[root] down within the max-heap arr[0:end]"""
+        while 2 * root + 1 < end:
+            child = 2 * root + 1
+            if child + 1 < end:
+                if keep('compare'):
+                    steps.append({
+                        'type': 'compare',
+                        'array': arr.copy(),
+                        'comparing': [child, child + 1],
+                        'level': level,
+                        'pseudocode_line': 'if arr[right] > arr[left]:',
+                        'description': f'Comparing children {arr[child]} and {arr[child + 1]}'
+                    })
+                if arr[child + 1] > arr[child]:
+                    child += 1
+            
+            if keep('compare'):
+                steps.append({
+                    'type': 'compare',
+                    'array': arr.copy(),
+                    'comparing': [root, child],
+                    'level': level,
+                    'pseudocode_line': 'if arr[child] > arr[root]:',
+                    'description': f'Comparing parent {arr[root]} with child {arr[child]}'
+                })
+            if arr[child] <= arr[root]:
+                return
+            
+            arr[root], arr[child] = arr[child], arr[root]
+            if keep('swap'):
+                steps.append({
+                    'type': 'swap',
+                    'array': arr.copy(),
+                    'swapped': [root, child],
+                    'level': level,
+                    'pseudocode_line': 'swap(arr[root], arr[child])',
+                    'description': f'Swapped {arr[child]} down below {arr[root]}'
+                })
+            root = child
+    
+    if keep('build_heap'):
+        steps.append({
+            'type': 'build_heap',
+            'array': arr.copy(),
+            'pseudocode_line': 'build_max_heap(arr)',
+            'description': 'Building a max-heap'
+        })
+    for root in range(n // 2 - 1, -1, -1):
+        sift_down(root, n, 0)
+    
+    if keep('pass'):
         steps.append({
-            'type': 'pivot_place',
+            'type': 'pass',
             'array': arr.copy(),
-            'pivot_final_index': i + 1,
-            'pivot_value': pivot,
-            'level': level,
-            'pseudocode_line': f'place pivot at position {i + 1}',
-            'description': f'Placed pivot {pivot} at final position {i + 1}'
+            'pseudocode_line': 'build_max_heap(arr)',
+            'description': 'Max-heap built'
         })
+    
+    for end in range(n - 1, 0, -1):
+        arr[0], arr[end] = arr[end], arr[0]
+        if keep('extract'):
+            steps.append({
+                'type': 'extract',
+                'array': arr.copy(),
+                'swapped': [0, end],
+                'sorted_from': end,
+                'pseudocode_line': 'swap(arr[0], arr[end])',
+                'description': f'Moved max {arr[end]} to position {end}'
+            })
+        sift_down(0, end, 1)
         
-        return i + 1
+        if keep('pass'):
+            steps.append({
+                'type': 'pass',
+                'array': arr.copy(),
+                'sorted_from': end,
+                'pseudocode_line': 'siftDown(arr, 0, end)',
+                'description': f'Heap restored; positions {end} onward are sorted'
+            })
+    
+    steps.append({
+        'type': 'complete',
+        'array': arr.copy(),
+        'pseudocode_line': 'return arr',
+        'description': 'Heap sort complete!'
+    })
     
-    quick_sort_recursive(arr, 0, len(arr) - 1)
+    return steps
+
+SHELL_SORT_GAPS = ('shell', 'knuth', 'ciura')
+
+def shell_sort_gaps(n, sequence='ciura'):
+    """Return the decreasing gap sequence for shell sort on n elements"""
+    if sequence == 'shell':
+        gaps = []
+        gap = n // 2
+        while gap > 0:
+            gaps.append(gap)
+            gap //= 2
+        return gaps
+    if sequence == 'knuth':
+        gaps = [1]
+        while gaps[-1] * 3 + 1 < max(n // 3, 2):
+            gaps.append(gaps[-1] * 3 + 1)
+        return gaps[::-1]
+    if sequence == 'ciura':
+        gaps = [1, 4, 10, 23, 57, 132, 301, 701]
+        while gaps[-1] * 9 // 4 < n:
+            gaps.append(gaps[-1] * 9 // 4)
+        return [gap for gap in reversed(gaps) if gap < n] or [1]
+    raise ValueError(f'Unknown gap sequence: {sequence}')
+
+def shell_sort_steps(arr, gaps='ciura', detail='full'):
+    """Generate step-by-step shell sort visualization data
+
+    gaps selects the gap sequence: 'shell' (n/2, n/4, ...), 'knuth'
+    (1, 4, 13, 40, ...) or 'ciura' (1, 4, 10, 23, 57, ...).
+    """
+    steps = []
+    keep = sort_step_filter(detail, len(arr))
+    gap_sequence = shell_sort_gaps(len(arr), gaps)
+    
+    for gap in gap_sequence:
+        if keep('set_gap'):
+            steps.append({
+                'type': 'set_gap',
+                'array': arr.copy(),
+                'gap': gap,
+                'pseudocode_line': f'gap = {gap}',
+                'description': f'Gap-insertion sort with gap {gap}'
+            })
+        
+        for i in range(gap, len(arr)):
+            key = arr[i]
+            j = i
+            
+            if keep('select_key'):
+                steps.append({
+                    'type': 'select_key',
+                    'array': arr.copy(),
+                    'key_index': i,
+                    'key_value': key,
+                    'gap': gap,
+                    'pseudocode_line': f'key = arr[{i}] = {key}',
+                    'description': f'Inserting {key} into its gap-{gap} chain'
+                })
+            
+            while j >= gap and arr[j - gap] > key:
+                if keep('compare'):
+                    steps.append({
+                        'type': 'compare',
+                        'array': arr.copy(),
+                        'comparing': [j - gap, j],
+                        'key_value': key,
+                        'gap': gap,
+                        'pseudocode_line': f'arr[{j - gap}] > key',
+                        'description': f'{arr[j - gap]} > {key}, shifting right by {gap}'
+                    })
+                
+                arr[j] = arr[j - gap]
+                if keep('shift'):
+                    steps.append({
+                        'type': 'shift',
+                        'array': arr.copy(),
+                        'shifted': j,
+                        'key_value': key,
+                        'gap': gap,
+                        'pseudocode_line': f'arr[{j}] = arr[{j - gap}]',
+                        'description': f'Shifted {arr[j]} to position {j}'
+                    })
+                j -= gap
+            
+            if j != i:
+                arr[j] = key
+                if keep('insert'):
+                    steps.append({
+                        'type': 'insert',
+                        'array': arr.copy(),
+                        'inserted': j,
+                        'key_value': key,
+                        'gap': gap,
+                        'pseudocode_line': f'arr[{j}] = key',
+                        'description': f'Inserted {key} at position {j}'
+                    })
+        
+        if keep('pass'):
+            steps.append({
+                'type': 'pass',
+                'array': arr.copy(),
+                'gap': gap,
+                'pseudocode_line': f'gap = {gap}',
+                'description': f'Array is now {gap}-sorted'
+            })
     
     steps.append({
         'type': 'complete',
         'array': arr.copy(),
         'pseudocode_line': 'return arr',
-        'description': 'Quick sort complete!'
+        'description': 'Shell sort complete!'
     })
     
     return steps
 
-def get_sorting_complexity(algorithm):
-    """Return time and space complexity for sorting algorithms"""
-    complexities = {
-        'bubble': {'time_best': 'O(n)', 'time_avg': 'O(n²)', 'time_worst': 'O(n²)', 'space': 'O(1)'},
-        'selection': {'time_best': 'O(n²)', 'time_avg': 'O(n²)', 'time_worst': 'O(n²)', 'space': 'O(1)'},
-        'insertion': {'time_best': 'O(n)', 'time_avg': 'O(n²)', 'time_worst': 'O(n²)', 'space': 'O(1)'},
-        'merge': {'time_best': 'O(n log n)', 'time_avg': 'O(n log n)', 'time_worst': 'O(n log n)', 'space': 'O(n)'},
-        'quick': {'time_best': 'O(n log n)', 'time_avg': 'O(n log n)', 'time_worst': 'O(n²)', 'space': 'O(log n)'}
-    }
-    return complexities.get(algorithm, {})
+COUNTING_SORT_MAX_RANGE = 1_000_000
+
+def counting_sort_steps(arr, detail='full'):
+    """Generate step-by-step counting sort visualization data
+
+    Values are counted relative to the minimum, so negative numbers work.
+    Runs in O(n + k) for a value range of k.
+    """
+    steps = []
+    keep = sort_step_filter(detail, len(arr))
+    if not arr:
+        steps.append({
+            'type': 'complete',
+            'array': arr.copy(),
+            'pseudocode_line': 'return arr',
+            'description': 'Counting sort complete!'
+        })
+        return steps
+    
+    low, high = min(arr), max(arr)
+    if high - low + 1 > COUNTING_SORT_MAX_RANGE:
+        raise ValueError(f'Value range too large for counting sort (max {COUNTING_SORT_MAX_RANGE})')
+    counts = [0] * (high - low + 1)
+    
+    for i, value in enumerate(arr):
+        counts[value - low] += 1
+        if keep('count'):
+            steps.append({
+                'type': 'count',
+                'array': arr.copy(),
+                'key_index': i,
+                'key_value': value,
+                'pseudocode_line': f'count[{value}] += 1',
+                'description': f'Counting {value} ({counts[value - low]} so far)'
+            })
+    
+    if keep('pass'):
+        steps.append({
+            'type': 'pass',
+            'array': arr.copy(),
+            'pseudocode_line': 'count[value] += 1',
+            'description': 'Counted every value'
+        })
+    
+    k = 0
+    for offset, count in enumerate(counts):
+        for _ in range(count):
+            arr[k] = offset + low
+            if keep('write'):
+                steps.append({
+                    'type': 'write',
+                    'array': arr.copy(),
+                    'written': k,
+                    'pseudocode_line': f'arr[{k}] = {arr[k]}',
+                    'description': f'Wrote {arr[k]} to position {k}'
+                })
+            k += 1
+    
+    steps.append({
+        'type': 'complete',
+        'array': arr.copy(),
+        'pseudocode_line': 'return arr',
+        'description': 'Counting sort complete!'
+    })
+    
+    return steps
+
+def radix_sort_steps(arr, base=10, detail='full'):
+    """Generate step-by-step LSD radix sort visualization data
+
+    Each pass distributes values into base buckets by one digit (of the
+    value minus the minimum, so negative numbers work) and writes the
+    buckets back in order.
+    """
+    steps = []
+    keep = sort_step_filter(detail, len(arr))
+    low = min(arr) if arr else 0
+    largest = max(arr) - low if arr else 0
+    exp = 1
+    
+    while True:
+        buckets = [[] for _ in range(base)]
+        if keep('digit_pass'):
+            steps.append({
+                'type': 'digit_pass',
+                'array': arr.copy(),
+                'digit': exp,
+                'pseudocode_line': f'for each digit (place {exp}):',
+                'description': f'Distributing by the {exp}s digit'
+            })
+        
+        for i, value in enumerate(arr):
+            digit = (value - low) // exp % base
+            buckets[digit].append(value)
+            if keep('bucket'):
+                steps.append({
+                    'type': 'bucket',
+                    'array': arr.copy(),
+                    'key_index': i,
+                    'key_value': value,
+                    'bucket': digit,
+                    'pseudocode_line': f'bucket[{digit}].append({value})',
+                    'description': f'{value} goes to bucket {digit}'
+                })
+        
+        k = 0
+        for bucket in buckets:
+            for value in bucket:
+                arr[k] = value
+                if keep('write'):
+                    steps.append({
+                        'type': 'write',
+                        'array': arr.copy(),
+                        'written': k,
+                        'digit': exp,
+                        'pseudocode_line': f'arr[{k}] = {value}',
+                        'description': f'Wrote {value} to position {k}'
+                    })
+                k += 1
+        
+        if keep('pass'):
+            steps.append({
+                'type': 'pass',
+                'array': arr.copy(),
+                'digit': exp,
+                'pseudocode_line': 'arr = concatenate(buckets)',
+                'description': f'Sorted by the {exp}s digit'
+            })
+        
+        if largest // exp < base:
+            break
+        exp *= base
+    
+    steps.append({
+        'type': 'complete',
+        'array': arr.copy(),
+        'pseudocode_line': 'return arr',
+        'description': 'Radix sort complete!'
+    })
+    
+    return steps
+
+SORTING_INPUT_KINDS = ('random', 'sorted', 'reversed', 'nearly_sorted')
+MAX_SORTING_INPUT = 100_000
+
+def generate_sorting_input(kind='random', size=8, seed=None):
+    """Generate a sorting input array on the server
+
+    Values are drawn from [1, 1000]; nearly_sorted swaps about 5% of the
+    positions of a sorted array. The same seed always yields the same array.
+    """
+    import numpy as np
+    
+    if kind not in SORTING_INPUT_KINDS:
+        raise ValueError(f'Unknown input kind: {kind}')
+    if not 0 < size <= MAX_SORTING_INPUT:
+        raise ValueError(f'size must be between 1 and {MAX_SORTING_INPUT}')
+    
+    rng = np.random.default_rng(seed)
+    values = rng.integers(1, 1001, size=size)
+    if kind != 'random':
+        values.sort()
+    if kind == 'reversed':
+        values = values[::-1]
+    elif kind == 'nearly_sorted':
+        swaps = max(1, size // 20)
+        pairs = rng.integers(0, size, size=(swaps, 2)).tolist()
+        values = values.tolist()
+        for i, j in pairs:
+            values[i], values[j] = values[j], values[i]
+        return values
+    
+    return values.tolist()
 
 # Tree Algorithms
 
@@ -564,347 +1273,876 @@ def postorder_traversal_steps(root):
 
 # Recursion Algorithms
 
+class RecursionTrace:
+    """Compact call/return event log for a traced recursive function
+
+    run() drives a generator-based recursive function, recording a 'call'
+    event on entry and a 'return' event (with the result) on exit of each
+    frame; the function body adds its own events with log(). Frames are
+    driven iteratively, so deep recursions are not limited by Python's
+    stack. Events are stored in parallel lists keyed by frame id, so
+    recording is a few appends per call with no stack copies. steps()
+    derives the step dictionaries on demand.
+    """
+
+    def __init__(self):
+        self.kinds = []
+        self.frames = []
+        self.values = []
+        self.frame_args = []
+        self.frame_depths = []
+        self._active = []
+
+    def _enter(self, args):
+        frame = len(self.frame_args)
+        self.frame_args.append(args)
+        self.frame_depths.append(len(self._active))
+        self._active.append(frame)
+        self.log('call')
+    
+    def _leave(self, result):
+        self.log('return', result)
+        self._active.pop()
+    
+    def run(self, func, *args):
+        """Drive a generator-based recursive function iteratively
+
+        func is a generator function that requests a recursive call by
+        yielding its argument tuple and receives the result from the yield;
+        its return value is the frame's result. Pending frames live on a
+        list, so depth is bounded by memory rather than the recursion limit.
+        """
+        self._enter(args)
+        pending = [func(*args)]
+        sent = None
+        while True:
+            try:
+                child_args = pending[-1].send(sent)
+            except StopIteration as stop:
+                self._leave(stop.value)
+                pending.pop()
+                if not pending:
+                    return stop.value
+                sent = stop.value
+            else:
+                self._enter(child_args)
+                pending.append(func(*child_args))
+                sent = None
+
+    def log(self, kind, value=None):
+        """Record an event in the innermost active frame"""
+        self.kinds.append(kind)
+        self.frames.append(self._active[-1] if self._active else -1)
+        self.values.append(value)
+
+    def events(self):
+        """Return the raw log as JSON-friendly frames and events"""
+        return {
+            'frames': [list(args) for args in self.frame_args],
+            'depths': self.frame_depths,
+            'events': [[kind, frame, value] for kind, frame, value
+                       in zip(self.kinds, self.frames, self.values)]
+        }
+
+    def steps(self, label, render):
+        """Derive step dictionaries from the log
+
+        label(*args) names a frame on the call stack. render(kind, args,
+        depth, value, call_stack) returns a step dict or None to drop the
+        event. The call_stack list is only rebuilt when a frame is pushed or
+        popped, so consecutive steps share one snapshot. With label=None no
+        call stack is tracked at all (call_stack is None), which keeps very
+        deep traces linear.
+        """
+        steps = []
+        labels = []
+        call_stack = None if label is None else []
+        for kind, frame, value in zip(self.kinds, self.frames, self.values):
+            if label is None:
+                pass
+            elif kind == 'call':
+                labels.append(label(*self.frame_args[frame]))
+                call_stack = labels.copy()
+            args = self.frame_args[frame] if frame >= 0 else ()
+            depth = self.frame_depths[frame] if frame >= 0 else 0
+            step = render(kind, args, depth, value, call_stack)
+            if step is not None:
+                steps.append(step)
+            if kind == 'return' and label is not None:
+                labels.pop()
+                call_stack = labels.copy()
+        return steps
+
+def factorial_trace(n):
+    """Run factorial(n) under a RecursionTrace and return the trace"""
+    trace = RecursionTrace()
+    
+    def factorial(n):
+        if n <= 1:
+            trace.log('base_case', 1)
+            return 1
+        trace.log('recursive_call')
+        return n * (yield (n - 1,))
+    
+    trace.run(factorial, n)
+    return trace
+
 def factorial_steps(n):
     """Generate factorial recursion steps"""
-    steps = []
-    call_stack = []
+    def render(kind, args, depth, value, call_stack):
+        n, = args
+        step = {'type': kind, 'n': n}
+        if kind == 'call':
+            step.update({
+                'call_stack': call_stack,
+                'depth': depth,
+                'pseudocode_line': f'factorial({n})',
+                'description': f'Calculating factorial of {n}'
+            })
+        elif kind == 'base_case':
+            step.update({
+                'result': value,
+                'call_stack': call_stack,
+                'depth': depth,
+                'pseudocode_line': f'return 1',
+                'description': f'Base case: factorial({n}) = 1'
+            })
+        elif kind == 'recursive_call':
+            step.update({
+                'call_stack': call_stack,
+                'depth': depth,
+                'pseudocode_line': f'return {n} * factorial({n-1})',
+                'description': f'Recursive call: {n} * factorial({n-1})'
+            })
+        elif n <= 1:
+            return None  # the base case step already reported the result
+        else:
+            sub_result = value // n
+            step.update({
+                'result': value,
+                'call_stack': call_stack,
+                'depth': depth,
+                'pseudocode_line': f'return {n} * {sub_result} = {value}',
+                'description': f'Returning: {n} * {sub_result} = {value}'
+            })
+        return step
     
-    def factorial_recursive(n, depth=0):
-        call_stack.append(f"factorial({n})")
-        steps.append({
-            'type': 'call',
-            'n': n,
-            'call_stack': call_stack.copy(),
-            'depth': depth,
-            'pseudocode_line': f'factorial({n})',
-            'description': f'Calculating factorial of {n}'
-        })
-        
+    return factorial_trace(n).steps(lambda n: f"factorial({n})", render)
+
+# mode=auto switches to the linear trace above this; standard traces repeat
+# the call stack (and, for reverse, every suffix) per step, so their JSON
+# grows quadratically or worse and is capped here
+LONG_INPUT_THRESHOLD = 200
+MAX_TRACED_DEPTH = 1000  # largest input for traces that embed call stacks or big results
+
+def factorial_long_trace(n):
+    """Run factorial(n) iteratively, tracking log10 of each result"""
+    trace = RecursionTrace()
+    
+    def factorial(n):
         if n <= 1:
-            result = 1
-            steps.append({
-                'type': 'base_case',
-                'n': n,
-                'result': result,
-                'call_stack': call_stack.copy(),
-                'depth': depth,
-                'pseudocode_line': f'return 1',
+            trace.log('base_case')
+            return 0.0
+        trace.log('recursive_call')
+        return math.log10(n) + (yield (n - 1,))
+    
+    trace.run(factorial, n)
+    return trace
+
+def factorial_long_steps(n):
+    """Generate factorial steps for large n in linear time and memory
+
+    Frames are driven iteratively, no call stack is embedded, and results
+    are reported as digit counts ('result_digits') rather than big integers.
+    Each frame returns log10 of its result, which is all the count needs.
+    """
+    def render(kind, args, depth, value, call_stack):
+        n, = args
+        step = {'type': kind, 'n': n, 'depth': depth}
+        if kind == 'call':
+            step.update({
+                'pseudocode_line': f'factorial({n})',
+                'description': f'Calculating factorial of {n}'
+            })
+        elif kind == 'base_case':
+            step.update({
+                'result': 1,
+                'pseudocode_line': 'return 1',
                 'description': f'Base case: factorial({n}) = 1'
             })
-        else:
-            steps.append({
-                'type': 'recursive_call',
-                'n': n,
-                'call_stack': call_stack.copy(),
-                'depth': depth,
+        elif kind == 'recursive_call':
+            step.update({
                 'pseudocode_line': f'return {n} * factorial({n-1})',
                 'description': f'Recursive call: {n} * factorial({n-1})'
             })
-            
-            sub_result = factorial_recursive(n - 1, depth + 1)
-            result = n * sub_result
-            
-            steps.append({
-                'type': 'return',
-                'n': n,
-                'result': result,
-                'call_stack': call_stack.copy(),
-                'depth': depth,
-                'pseudocode_line': f'return {n} * {sub_result} = {result}',
-                'description': f'Returning: {n} * {sub_result} = {result}'
+        elif n <= 1:
+            return None
+        else:
+            digits = int(value) + 1
+            step.update({
+                'result_digits': digits,
+                'pseudocode_line': f'return {n} * factorial({n-1})',
+                'description': f'Returning: factorial({n}) has {digits} digits'
             })
-        
-        call_stack.pop()
+        return step
+    
+    return factorial_long_trace(n).steps(None, render)
+
+def fibonacci_trace(n):
+    """Run memoized fib(n) under a RecursionTrace; returns (trace, memo)"""
+    trace = RecursionTrace()
+    memo = {}
+    
+    def fib(n):
+        if n <= 1:
+            trace.log('base_case', n)
+            result = n
+        else:
+            trace.log('recursive_call')
+            result = 0
+            for m in (n - 1, n - 2):
+                if m in memo:
+                    # Memo hits never open a frame
+                    trace.log('memoized', m)
+                    result += memo[m]
+                else:
+                    result += yield (m,)
+        memo[n] = result
         return result
     
-    factorial_recursive(n)
-    return steps
+    trace.run(fib, n)
+    return trace, memo
 
 def fibonacci_steps(n):
     """Generate fibonacci recursion steps"""
-    steps = []
-    call_stack = []
-    memo = {}
+    trace, memo = fibonacci_trace(n)
     
-    def fib_recursive(n, depth=0):
-        if n in memo:
-            steps.append({
+    def render(kind, args, depth, value, call_stack):
+        if kind == 'memoized':
+            return {
                 'type': 'memoized',
-                'n': n,
-                'result': memo[n],
-                'call_stack': call_stack.copy(),
+                'n': value,
+                'result': memo[value],
+                'call_stack': call_stack,
+                'depth': depth + 1,
+                'pseudocode_line': f'return memo[{value}] = {memo[value]}',
+                'description': f'Memoized: fib({value}) = {memo[value]}'
+            }
+        
+        n, = args
+        step = {'type': kind, 'n': n}
+        if kind == 'call':
+            step.update({
+                'call_stack': call_stack,
                 'depth': depth,
-                'pseudocode_line': f'return memo[{n}] = {memo[n]}',
-                'description': f'Memoized: fib({n}) = {memo[n]}'
+                'pseudocode_line': f'fib({n})',
+                'description': f'Calculating fibonacci of {n}'
             })
-            return memo[n]
-        
-        call_stack.append(f"fib({n})")
-        steps.append({
-            'type': 'call',
-            'n': n,
-            'call_stack': call_stack.copy(),
-            'depth': depth,
-            'pseudocode_line': f'fib({n})',
-            'description': f'Calculating fibonacci of {n}'
-        })
-        
-        if n <= 1:
-            result = n
-            steps.append({
-                'type': 'base_case',
-                'n': n,
-                'result': result,
-                'call_stack': call_stack.copy(),
+        elif kind == 'base_case':
+            step.update({
+                'result': value,
+                'call_stack': call_stack,
                 'depth': depth,
                 'pseudocode_line': f'return {n}',
                 'description': f'Base case: fib({n}) = {n}'
             })
-        else:
-            steps.append({
-                'type': 'recursive_call',
-                'n': n,
-                'call_stack': call_stack.copy(),
+        elif kind == 'recursive_call':
+            step.update({
+                'call_stack': call_stack,
                 'depth': depth,
                 'pseudocode_line': f'return fib({n-1}) + fib({n-2})',
                 'description': f'Recursive call: fib({n-1}) + fib({n-2})'
             })
-            
-            left = fib_recursive(n - 1, depth + 1)
-            right = fib_recursive(n - 2, depth + 1)
-            result = left + right
-            
-            steps.append({
-                'type': 'return',
-                'n': n,
-                'result': result,
-                'call_stack': call_stack.copy(),
+        elif n <= 1:
+            return None
+        else:
+            left, right = memo[n - 1], memo[n - 2]
+            step.update({
+                'result': value,
+                'call_stack': call_stack,
                 'depth': depth,
-                'pseudocode_line': f'return {left} + {right} = {result}',
-                'description': f'Returning: {left} + {right} = {result}'
+                'pseudocode_line': f'return {left} + {right} = {value}',
+                'description': f'Returning: {left} + {right} = {value}'
             })
-        
-        memo[n] = result
-        call_stack.pop()
-        return result
+        return step
     
-    fib_recursive(n)
-    return steps
+    return trace.steps(lambda n: f"fib({n})", render)
 
-def tower_of_hanoi_steps(n):
-    """Generate Tower of Hanoi recursion steps with disk tracking"""
-    steps = []
-    call_stack = []
+FIBONACCI_STRATEGIES = ('naive', 'memo', 'bottomup')
+FIBONACCI_CALL_BUDGET = 100_000
+FIBONACCI_TREE_MAX_N = 2000
+
+def fibonacci_call_counts(n):
+    """Total fib() calls (or table fills for bottomup) made by each strategy"""
+    a, b = 0, 1
+    for _ in range(n + 1):
+        a, b = b, a + b
+    return {
+        'naive': 2 * a - 1,
+        'memo': max(2 * n - 1, 1),
+        'bottomup': n + 1
+    }
+
+def fibonacci_call_tree(n, strategy='memo', max_calls=FIBONACCI_CALL_BUDGET):
+    """Build a compact fib(n) call tree for the given strategy
+
+    Each node is [parent_id, n, result, memo_hit] and its id is its index in
+    call order (the root has parent -1). For bottomup the "tree" is the table
+    fill chain, each entry pointing at the one before it. Naive expansion
+    stops after max_calls nodes; unfinished nodes keep a result of None and
+    the tree is flagged as truncated.
+    """
+    if strategy not in FIBONACCI_STRATEGIES:
+        raise ValueError(f'Unknown fibonacci strategy: {strategy}')
+    if not 0 <= n <= FIBONACCI_TREE_MAX_N:
+        raise ValueError(f'n must be between 0 and {FIBONACCI_TREE_MAX_N}')
     
-    # Initialize rod states - A has all disks, B and C are empty
-    rod_states = {
-        'A': list(range(n, 0, -1)),  # [n, n-1, ..., 2, 1] (largest at bottom)
-        'B': [],
-        'C': []
+    nodes = []
+    truncated = False
+    if strategy == 'bottomup':
+        a, b = 0, 1
+        for i in range(n + 1):
+            nodes.append([i - 1, i, a, False])
+            a, b = b, a + b
+    else:
+        memo = {} if strategy == 'memo' else None
+        nodes.append([-1, n, None, False])
+        # Frames are [node_id, phase, child ids]; phase 0 = entered,
+        # 1 = left child returned, 2 = both children returned
+        stack = [[0, 0, []]]
+        while stack:
+            frame = stack[-1]
+            node_id, phase = frame[0], frame[1]
+            node = nodes[node_id]
+            k = node[1]
+            if phase == 0:
+                if memo is not None and k in memo:
+                    node[2], node[3] = memo[k], True
+                    stack.pop()
+                    continue
+                if k <= 1:
+                    node[2] = k
+                    if memo is not None:
+                        memo[k] = k
+                    stack.pop()
+                    continue
+            elif phase == 2:
+                left, right = frame[2]
+                node[2] = nodes[left][2] + nodes[right][2]
+                if memo is not None:
+                    memo[k] = node[2]
+                stack.pop()
+                continue
+            if len(nodes) >= max_calls:
+                truncated = True
+                break
+            frame[1] = phase + 1
+            nodes.append([node_id, k - 1 - phase, None, False])
+            frame[2].append(len(nodes) - 1)
+            stack.append([len(nodes) - 1, 0, []])
+    
+    return {
+        'strategy': strategy,
+        'n': n,
+        'fields': ['parent', 'n', 'result', 'memo_hit'],
+        'nodes': nodes,
+        'calls': len(nodes),
+        'truncated': truncated,
+        'call_counts': fibonacci_call_counts(n)
     }
+
+def tower_of_hanoi_trace(n):
+    """Run hanoi(n, 'A', 'C', 'B') under a RecursionTrace and return the trace"""
+    trace = RecursionTrace()
+    rods = {'A': list(range(n, 0, -1)), 'B': [], 'C': []}
     
     def move_disk(source, destination):
         """Move one disk from source to destination"""
-        if rod_states[source]:
-            disk = rod_states[source].pop()
-            rod_states[destination].append(disk)
+        if rods[source]:
+            disk = rods[source].pop()
+            rods[destination].append(disk)
             return disk
         return None
     
-    def hanoi_recursive(n, source, destination, auxiliary, depth=0):
-        call_stack.append(f"hanoi({n}, {source}, {destination}, {auxiliary})")
-        steps.append({
-            'type': 'call',
-            'n': n,
-            'source': source,
-            'destination': destination,
-            'auxiliary': auxiliary,
-            'call_stack': call_stack.copy(),
-            'depth': depth,
-            'rod_states': {k: v.copy() for k, v in rod_states.items()},
-            'pseudocode_line': f'hanoi({n}, {source}, {destination}, {auxiliary})',
-            'description': f'Move {n} disks from {source} to {destination} using {auxiliary}'
-        })
+    def hanoi(n, source, destination, auxiliary):
+        if n <= 1:
+            trace.log('move', move_disk(source, destination))
+        else:
+            trace.log('step1')
+            yield (n - 1, source, auxiliary, destination)
+            trace.log('step2', move_disk(source, destination))
+            trace.log('step3')
+            yield (n - 1, auxiliary, destination, source)
+    
+    trace.run(hanoi, n, 'A', 'C', 'B')
+    return trace
+
+def tower_of_hanoi_steps(n):
+    """Generate Tower of Hanoi recursion steps with disk tracking
+
+    Rod states are replayed from the logged moves and only re-snapshotted
+    after a disk actually moves.
+    """
+    rod_states = {
+        'A': list(range(n, 0, -1)),  # [n, n-1, ..., 2, 1] (largest at bottom)
+        'B': [],
+        'C': []
+    }
+    snapshot = {k: v.copy() for k, v in rod_states.items()}
+    
+    def render(kind, args, depth, value, call_stack):
+        nonlocal snapshot
+        m, source, destination, auxiliary = args
         
-        if n == 1:
-            # Move the disk
-            disk = move_disk(source, destination)
-            steps.append({
+        if kind in ('move', 'step2') and value is not None:
+            rod_states[destination].append(rod_states[source].pop())
+            snapshot = {k: v.copy() for k, v in rod_states.items()}
+        
+        if kind == 'call':
+            return {
+                'type': 'call',
+                'n': m,
+                'source': source,
+                'destination': destination,
+                'auxiliary': auxiliary,
+                'call_stack': call_stack,
+                'depth': depth,
+                'rod_states': snapshot,
+                'pseudocode_line': f'hanoi({m}, {source}, {destination}, {auxiliary})',
+                'description': f'Move {m} disks from {source} to {destination} using {auxiliary}'
+            }
+        if kind == 'move':
+            return {
                 'type': 'move',
-                'disk': disk,
+                'disk': value,
                 'source': source,
                 'destination': destination,
-                'call_stack': call_stack.copy(),
+                'call_stack': call_stack,
                 'depth': depth,
-                'rod_states': {k: v.copy() for k, v in rod_states.items()},
-                'pseudocode_line': f'move disk {disk} from {source} to {destination}',
-                'description': f'Base case: Move disk {disk} from {source} to {destination}'
-            })
-        else:
-            # Step 1: Move n-1 disks from source to auxiliary
-            steps.append({
+                'rod_states': snapshot,
+                'pseudocode_line': f'move disk {value} from {source} to {destination}',
+                'description': f'Base case: Move disk {value} from {source} to {destination}'
+            }
+        if kind == 'step1':
+            return {
                 'type': 'step1',
-                'n': n,
-                'call_stack': call_stack.copy(),
+                'n': m,
+                'call_stack': call_stack,
                 'depth': depth,
-                'rod_states': {k: v.copy() for k, v in rod_states.items()},
-                'pseudocode_line': f'hanoi({n-1}, {source}, {auxiliary}, {destination})',
-                'description': f'Step 1: Move {n-1} disks from {source} to {auxiliary}'
-            })
-            hanoi_recursive(n - 1, source, auxiliary, destination, depth + 1)
-            
-            # Step 2: Move the nth disk from source to destination
-            disk = move_disk(source, destination)
-            steps.append({
+                'rod_states': snapshot,
+                'pseudocode_line': f'hanoi({m-1}, {source}, {auxiliary}, {destination})',
+                'description': f'Step 1: Move {m-1} disks from {source} to {auxiliary}'
+            }
+        if kind == 'step2':
+            return {
                 'type': 'step2',
-                'disk': disk,
+                'disk': value,
                 'source': source,
                 'destination': destination,
-                'call_stack': call_stack.copy(),
+                'call_stack': call_stack,
                 'depth': depth,
-                'rod_states': {k: v.copy() for k, v in rod_states.items()},
-                'pseudocode_line': f'move disk {disk} from {source} to {destination}',
-                'description': f'Step 2: Move disk {disk} from {source} to {destination}'
-            })
-            
-            # Step 3: Move n-1 disks from auxiliary to destination
-            steps.append({
+                'rod_states': snapshot,
+                'pseudocode_line': f'move disk {value} from {source} to {destination}',
+                'description': f'Step 2: Move disk {value} from {source} to {destination}'
+            }
+        if kind == 'step3':
+            return {
                 'type': 'step3',
-                'n': n,
-                'call_stack': call_stack.copy(),
+                'n': m,
+                'call_stack': call_stack,
                 'depth': depth,
-                'rod_states': {k: v.copy() for k, v in rod_states.items()},
-                'pseudocode_line': f'hanoi({n-1}, {auxiliary}, {destination}, {source})',
-                'description': f'Step 3: Move {n-1} disks from {auxiliary} to {destination}'
-            })
-            hanoi_recursive(n - 1, auxiliary, destination, source, depth + 1)
-        
-        call_stack.pop()
-        steps.append({
+                'rod_states': snapshot,
+                'pseudocode_line': f'hanoi({m-1}, {auxiliary}, {destination}, {source})',
+                'description': f'Step 3: Move {m-1} disks from {auxiliary} to {destination}'
+            }
+        return {
             'type': 'return',
-            'n': n,
-            'call_stack': call_stack.copy(),
+            'n': m,
+            'call_stack': call_stack[:-1],  # reported after the frame is popped
             'depth': depth,
-            'rod_states': {k: v.copy() for k, v in rod_states.items()},
-            'pseudocode_line': f'return from hanoi({n})',
-            'description': f'Completed moving {n} disks'
-        })
+            'rod_states': snapshot,
+            'pseudocode_line': f'return from hanoi({m})',
+            'description': f'Completed moving {m} disks'
+        }
     
-    # Initial state
-    steps.append({
+    steps = [{
         'type': 'initial',
-        'rod_states': {k: v.copy() for k, v in rod_states.items()},
+        'rod_states': snapshot,
         'pseudocode_line': 'Initial setup',
         'description': f'Initial setup: {n} disks on rod A'
-    })
-    
-    hanoi_recursive(n, 'A', 'C', 'B')
+    }]
+    steps.extend(tower_of_hanoi_trace(n).steps(
+        lambda m, source, destination, auxiliary: f"hanoi({m}, {source}, {destination}, {auxiliary})",
+        render
+    ))
     return steps
 
-def reverse_string_steps(text):
-    """Generate string reversal recursion steps"""
-    steps = []
-    call_stack = []
+def reverse_string_trace(text):
+    """Run reverse(text) under a RecursionTrace and return the trace"""
+    trace = RecursionTrace()
     
-    def reverse_recursive(s, depth=0):
-        call_stack.append(f"reverse('{s}')")
-        steps.append({
-            'type': 'call',
-            'string': s,
-            'call_stack': call_stack.copy(),
-            'depth': depth,
-            'pseudocode_line': f"reverse('{s}')",
-            'description': f"Reversing string '{s}'"
-        })
-        
+    def reverse(s):
         if len(s) <= 1:
-            result = s
-            steps.append({
-                'type': 'base_case',
-                'string': s,
-                'result': result,
-                'call_stack': call_stack.copy(),
+            trace.log('base_case', s)
+            return s
+        trace.log('recursive_call')
+        return (yield (s[1:],)) + s[0]
+    
+    trace.run(reverse, text)
+    return trace
+
+def reverse_string_steps(text):
+    """Generate string reversal recursion steps"""
+    def render(kind, args, depth, value, call_stack):
+        s, = args
+        step = {'type': kind, 'string': s}
+        if kind == 'call':
+            step.update({
+                'call_stack': call_stack,
+                'depth': depth,
+                'pseudocode_line': f"reverse('{s}')",
+                'description': f"Reversing string '{s}'"
+            })
+        elif kind == 'base_case':
+            step.update({
+                'result': value,
+                'call_stack': call_stack,
                 'depth': depth,
                 'pseudocode_line': f"return '{s}'",
                 'description': f"Base case: '{s}' is already reversed"
             })
-        else:
-            first_char = s[0]
-            rest = s[1:]
-            
-            steps.append({
-                'type': 'recursive_call',
-                'string': s,
+        elif kind == 'recursive_call':
+            first_char, rest = s[0], s[1:]
+            step.update({
                 'first_char': first_char,
                 'rest': rest,
-                'call_stack': call_stack.copy(),
+                'call_stack': call_stack,
                 'depth': depth,
                 'pseudocode_line': f"return reverse('{rest}') + '{first_char}'",
                 'description': f"Split: '{first_char}' + reverse('{rest}')"
             })
-            
-            reversed_rest = reverse_recursive(rest, depth + 1)
-            result = reversed_rest + first_char
-            
-            steps.append({
-                'type': 'return',
-                'string': s,
-                'result': result,
-                'call_stack': call_stack.copy(),
+        elif len(s) <= 1:
+            return None
+        else:
+            first_char, reversed_rest = s[0], value[:-1]
+            step.update({
+                'result': value,
+                'call_stack': call_stack,
                 'depth': depth,
-                'pseudocode_line': f"return '{reversed_rest}' + '{first_char}' = '{result}'",
-                'description': f"Returning: '{reversed_rest}' + '{first_char}' = '{result}'"
+                'pseudocode_line': f"return '{reversed_rest}' + '{first_char}' = '{value}'",
+                'description': f"Returning: '{reversed_rest}' + '{first_char}' = '{value}'"
             })
-        
-        call_stack.pop()
-        return result
+        return step
     
-    reverse_recursive(text)
-    return steps
+    return reverse_string_trace(text).steps(lambda s: f"reverse('{s}')", render)
 
-def get_recursion_complexity(algorithm):
-    """Return time and space complexity for recursion algorithms"""
-    complexities = {
-        'factorial': {'time': 'O(n)', 'space': 'O(n)'},
-        'fibonacci': {'time': 'O(2^n)', 'space': 'O(n)'},
-        'tower': {'time': 'O(2^n)', 'space': 'O(n)'},
-        'reverse': {'time': 'O(n)', 'space': 'O(n)'}
-    }
-    return complexities.get(algorithm, {})
+def reverse_string_long_trace(text):
+    """Run reverse(text) iteratively with frames named by suffix offset"""
+    n = len(text)
+    trace = RecursionTrace()
+    
+    def reverse(start):
+        if n - start <= 1:
+            trace.log('base_case')
+            return
+        trace.log('recursive_call')
+        yield (start + 1,)
+    
+    trace.run(reverse, 0)
+    return trace
+
+def reverse_string_long_steps(text):
+    """Generate string reversal steps for long strings in linear time and memory
+
+    Frames are identified by the start offset of the suffix they reverse
+    instead of the suffix itself, results are reported by length, and no
+    call stack is embedded. The full text is included once, on the first
+    step. Frames are driven iteratively, so length is not capped by the
+    recursion limit.
+    """
+    n = len(text)
+    
+    def render(kind, args, depth, value, call_stack):
+        start, = args
+        step = {'type': kind, 'start': start, 'depth': depth}
+        if kind == 'call':
+            step.update({
+                'pseudocode_line': f'reverse(s[{start}:])',
+                'description': f'Reversing the {n - start} characters from position {start}'
+            })
+        elif kind == 'base_case':
+            step.update({
+                'result_length': n - start,
+                'pseudocode_line': f'return s[{start}:]',
+                'description': f'Base case: s[{start}:] is already reversed'
+            })
+        elif kind == 'recursive_call':
+            step.update({
+                'first_char': text[start],
+                'pseudocode_line': f"return reverse(s[{start + 1}:]) + s[{start}]",
+                'description': f"Split: '{text[start]}' + reverse(s[{start + 1}:])"
+            })
+        elif n - start <= 1:
+            return None
+        else:
+            step.update({
+                'first_char': text[start],
+                'result_length': n - start,
+                'pseudocode_line': f"return reverse(s[{start + 1}:]) + s[{start}]",
+                'description': f"Appended '{text[start]}': s[{start}:] reversed"
+            })
+        return step
+    
+    steps = reverse_string_long_trace(text).steps(None, render)
+    steps[0]['text'] = text
+    return steps
 
 # Graph Algorithms
 
-def build_graph(nodes_count, edges):
-    """Build adjacency list representation of graph"""
-    graph = defaultdict(list)
-    for u, v in edges:
-        graph[u].append(v)
-        graph[v].append(u)  # Undirected graph
-    return graph
+class CSRGraph:
+    """Undirected graph in compressed sparse row form
+
+    ``offsets[u]:offsets[u + 1]`` indexes the neighbors of ``u`` inside the
+    flat ``targets`` array. Neighbor lists are sorted once at build time, with
+    duplicate edges and self-loops removed. ``weights``, when present, is
+    aligned with ``targets``.
+    """
+
+    def __init__(self, nodes_count, offsets, targets, weights=None):
+        self.nodes_count = nodes_count
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    def __len__(self):
+        return self.nodes_count
+
+    def __getitem__(self, node):
+        return self.neighbors(node)
+
+    def neighbors(self, node):
+        """Return the sorted neighbors of node (empty for unknown nodes)"""
+        if not 0 <= node < self.nodes_count:
+            return array('l')
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def edge_weights(self, node):
+        """Return weights aligned with neighbors(node), 1 for unweighted graphs"""
+        if not 0 <= node < self.nodes_count:
+            return array('d')
+        start, end = self.offsets[node], self.offsets[node + 1]
+        if self.weights is None:
+            return array('d', [1.0]) * (end - start)
+        return self.weights[start:end]
+
+    def degree(self, node):
+        if not 0 <= node < self.nodes_count:
+            return 0
+        return self.offsets[node + 1] - self.offsets[node]
+
+    @property
+    def edge_count(self):
+        return len(self.targets) // 2
+
+def build_graph(nodes_count, edges, weights=None):
+    """Build CSR representation of an undirected graph
+
+    weights, if given, is aligned with edges; duplicate edges keep their
+    smallest weight.
+    """
+    nodes_count = max([nodes_count] + [max(u, v) + 1 for u, v in edges])
+    
+    # Encode each directed half-edge as one int so a single sort both groups
+    # rows and orders neighbors; the dict drops duplicate edges
+    key_weights = {}
+    for i, (u, v) in enumerate(edges):
+        if u != v:
+            w = 1.0 if weights is None else weights[i]
+            for key in (u * nodes_count + v, v * nodes_count + u):
+                if w < key_weights.get(key, float('inf')):
+                    key_weights[key] = w
+    keys = sorted(key_weights)
+    
+    offsets = array('l', [0]) * (nodes_count + 1)
+    targets = array('l', [0]) * len(keys)
+    for i, key in enumerate(keys):
+        u, v = divmod(key, nodes_count)
+        targets[i] = v
+        offsets[u + 1] += 1
+    for u in range(nodes_count):
+        offsets[u + 1] += offsets[u]
+    
+    edge_weights = None
+    if weights is not None:
+        edge_weights = array('d', (key_weights[key] for key in keys))
+    
+    return CSRGraph(nodes_count, offsets, targets, edge_weights)
+
+def build_graph_from_arrays(nodes_count, sources, targets, weights=None):
+    """Build a CSR graph from parallel endpoint arrays using NumPy
+
+    Vectorized counterpart of build_graph for bulk uploads. Endpoints must
+    already be validated against nodes_count. Duplicate edges keep their
+    smallest weight.
+    """
+    import numpy as np
+    
+    src = np.asarray(sources, dtype=np.int64)
+    dst = np.asarray(targets, dtype=np.int64)
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    
+    keys = np.concatenate([src * nodes_count + dst, dst * nodes_count + src])
+    if weights is None:
+        keys = np.unique(keys)
+    else:
+        w = np.asarray(weights, dtype=np.float64)[keep]
+        w = np.concatenate([w, w])
+        order = np.lexsort((w, keys))
+        keys, w = keys[order], w[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        keys, w = keys[first], w[first]
+    
+    rows, cols = np.divmod(keys, nodes_count)
+    offsets = np.zeros(nodes_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=nodes_count), out=offsets[1:])
+    
+    return CSRGraph(
+        nodes_count,
+        array('l', offsets.tolist()),
+        array('l', cols.tolist()),
+        None if weights is None else array('d', w.tolist())
+    )
+
+LAYOUT_ITERATIONS = 100
+LAYOUT_EXACT_MAX_NODES = 200  # above this, repulsion comes from grid cells
+LAYOUT_GRAVITY = 1.0
+LAYOUT_BLOCK_SIZE = 512  # rows of pairwise terms held in memory at once
+
+def force_directed_layout(graph, iterations=LAYOUT_ITERATIONS, seed=0):
+    """Fruchterman-Reingold layout of a CSR graph using NumPy
+
+    Runs a fixed number of iterations from seeded random positions, so the
+    same edge set always gets the same layout. Repulsion is exact for up to
+    LAYOUT_EXACT_MAX_NODES nodes; larger graphs are binned into a grid and
+    each node is repelled by the other cells' centers of mass (and by the
+    rest of its own cell). A weak pull toward the center keeps disconnected
+    components together. Returns an (n, 2) array scaled to [0, 1].
+    """
+    import numpy as np
+    
+    n = graph.nodes_count
+    rng = np.random.default_rng(seed)
+    positions = rng.random((n, 2))
+    if n < 2:
+        return np.full((n, 2), 0.5)
+    
+    offsets = np.asarray(graph.offsets, dtype=np.int64)
+    targets = np.asarray(graph.targets, dtype=np.int64)
+    sources = np.repeat(np.arange(n), np.diff(offsets))
+    half = sources < targets
+    sources, targets = sources[half], targets[half]
+    
+    k = np.sqrt(1.0 / n)  # ideal edge length in a unit square
+    for iteration in range(iterations):
+        temperature = 0.1 * (1 - iteration / iterations)
+        if n <= LAYOUT_EXACT_MAX_NODES:
+            displacement = _exact_repulsion(positions, positions, np.ones(n), k)
+        else:
+            displacement = _grid_repulsion(positions, k)
+        
+        # Attraction along edges: d^2 / k toward each neighbor
+        delta = positions[sources] - positions[targets]
+        pull = delta * (np.hypot(delta[:, 0], delta[:, 1]) / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(sources, pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(targets, pull[:, axis], minlength=n)
+        displacement -= LAYOUT_GRAVITY * (positions - positions.mean(axis=0))
+        
+        # Move each node at most `temperature`
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 1e-12)
+        positions += displacement * (np.minimum(length, temperature) / length)[:, None]
+    
+    low = positions.min(axis=0)
+    extent = positions.max(axis=0) - low
+    extent[extent == 0] = 1.0
+    return (positions - low) / extent
+
+def _exact_repulsion(positions, sources, masses, k):
+    """k^2 / d repulsion on each position from weighted source points"""
+    import numpy as np
+    
+    displacement = np.empty_like(positions)
+    for start in range(0, len(positions), LAYOUT_BLOCK_SIZE):
+        stop = start + LAYOUT_BLOCK_SIZE
+        dx = positions[start:stop, 0, None] - sources[None, :, 0]
+        dy = positions[start:stop, 1, None] - sources[None, :, 1]
+        # Coincident points (including a node and itself) have dx = dy = 0
+        scale = masses / np.maximum(dx * dx + dy * dy, 1e-9)
+        displacement[start:stop, 0] = (dx * scale).sum(axis=1)
+        displacement[start:stop, 1] = (dy * scale).sum(axis=1)
+    return displacement * (k * k)
+
+def _grid_repulsion(positions, k):
+    """Approximate repulsion from the centers of mass of grid cells"""
+    import numpy as np
+    
+    n = len(positions)
+    size = min(int(np.ceil(2 * n ** 0.25)), 32)
+    low = positions.min(axis=0)
+    extent = np.maximum(positions.max(axis=0) - low, 1e-9)
+    cell_xy = np.minimum(((positions - low) / extent * size).astype(np.int64), size - 1)
+    cells = cell_xy[:, 1] * size + cell_xy[:, 0]
+    
+    masses = np.bincount(cells, minlength=size * size).astype(np.float64)
+    sums = np.stack([np.bincount(cells, positions[:, axis], minlength=size * size)
+                     for axis in range(2)], axis=1)
+    occupied = np.flatnonzero(masses)
+    centers = sums[occupied] / masses[occupied, None]
+    displacement = _exact_repulsion(positions, centers, masses[occupied], k)
+    
+    # Swap each node's own cell for the center of mass of its cellmates
+    own_mass = masses[cells]
+    own_center = sums[cells] / own_mass[:, None]
+    delta = positions - own_center
+    displacement -= k * k * own_mass[:, None] * delta / np.maximum((delta ** 2).sum(axis=1), 1e-9)[:, None]
+    mates = own_mass - 1
+    shared = mates > 0
+    mate_center = (sums[cells[shared]] - positions[shared]) / mates[shared, None]
+    delta = positions[shared] - mate_center
+    displacement[shared] += k * k * mates[shared, None] * delta / np.maximum((delta ** 2).sum(axis=1), 1e-9)[:, None]
+    return displacement
+
+def bfs_steps(graph, start, visited=None):
+    """Generate BFS traversal steps
 
-def bfs_steps(graph, start):
-    """Generate BFS traversal steps"""
+    Each step only carries the node that joined or left the queue or the
+    visited set; the client replays these deltas to rebuild the state, so
+    the trace stays linear in the size of the graph. A shared visited set
+    may be passed in to continue a whole-graph traversal.
+    """
     steps = []
-    visited = set()
+    visited = set() if visited is None else visited
+    in_queue = {start}  # O(1) frontier membership, mirrors the deque
     queue = deque([start])
     
     steps.append({
         'type': 'initialize',
-        'queue': list(queue),
-        'visited': list(visited),
         'current': None,
+        'enqueued': start,
         'pseudocode_line': f'queue = [{start}], visited = []',
         'description': f'Initialize BFS with start node {start}'
     })
     
     while queue:
         current = queue.popleft()
+        in_queue.discard(current)
         
         steps.append({
             'type': 'dequeue',
-            'queue': list(queue),
-            'visited': list(visited),
             'current': current,
+            'dequeued': current,
             'pseudocode_line': f'current = queue.popleft() = {current}',
             'description': f'Dequeue node {current}'
         })
@@ -914,50 +2152,50 @@ def bfs_steps(graph, start):
             
             steps.append({
                 'type': 'visit',
-                'queue': list(queue),
-                'visited': list(visited),
                 'current': current,
+                'visited_node': current,
                 'pseudocode_line': f'visited.add({current})',
                 'description': f'Visit node {current}'
             })
             
             neighbors = graph[current]
             for neighbor in neighbors:
-                if neighbor not in visited and neighbor not in queue:
+                if neighbor not in visited and neighbor not in in_queue:
                     queue.append(neighbor)
+                    in_queue.add(neighbor)
                     
                     steps.append({
                         'type': 'enqueue',
-                        'queue': list(queue),
-                        'visited': list(visited),
                         'current': current,
                         'neighbor': neighbor,
+                        'enqueued': neighbor,
                         'pseudocode_line': f'queue.append({neighbor})',
                         'description': f'Enqueue neighbor {neighbor} of {current}'
                     })
     
     steps.append({
         'type': 'complete',
-        'queue': list(queue),
-        'visited': list(visited),
         'current': None,
+        'visited_count': len(visited),
         'pseudocode_line': 'BFS complete',
         'description': 'BFS traversal completed'
     })
     
     return steps
 
-def dfs_steps(graph, start):
-    """Generate DFS traversal steps"""
+def dfs_steps(graph, start, visited=None):
+    """Generate DFS traversal steps
+
+    Like BFS, steps carry only the node pushed, popped or visited.
+    """
     steps = []
-    visited = set()
+    visited = set() if visited is None else visited
     stack = [start]
     
     steps.append({
         'type': 'initialize',
-        'stack': stack.copy(),
-        'visited': list(visited),
         'current': None,
+        'pushed': start,
         'pseudocode_line': f'stack = [{start}], visited = []',
         'description': f'Initialize DFS with start node {start}'
     })
@@ -967,9 +2205,8 @@ def dfs_steps(graph, start):
         
         steps.append({
             'type': 'pop',
-            'stack': stack.copy(),
-            'visited': list(visited),
             'current': current,
+            'popped': current,
             'pseudocode_line': f'current = stack.pop() = {current}',
             'description': f'Pop node {current} from stack'
         })
@@ -979,35 +2216,231 @@ def dfs_steps(graph, start):
             
             steps.append({
                 'type': 'visit',
-                'stack': stack.copy(),
-                'visited': list(visited),
                 'current': current,
+                'visited_node': current,
                 'pseudocode_line': f'visited.add({current})',
                 'description': f'Visit node {current}'
             })
             
-            neighbors = sorted(graph[current], reverse=True)  # Reverse for consistent order
-            for neighbor in neighbors:
+            # Neighbors are pre-sorted; walk them backwards so the smallest pops first
+            for neighbor in reversed(graph.neighbors(current)):
                 if neighbor not in visited:
                     stack.append(neighbor)
                     
                     steps.append({
                         'type': 'push',
-                        'stack': stack.copy(),
-                        'visited': list(visited),
                         'current': current,
                         'neighbor': neighbor,
+                        'pushed': neighbor,
                         'pseudocode_line': f'stack.append({neighbor})',
                         'description': f'Push neighbor {neighbor} of {current} to stack'
                     })
     
     steps.append({
         'type': 'complete',
-        'stack': stack.copy(),
-        'visited': list(visited),
         'current': None,
+        'visited_count': len(visited),
         'pseudocode_line': 'DFS complete',
         'description': 'DFS traversal completed'
     })
     
     return steps
+
+def whole_graph_steps(graph, traversal, start=0):
+    """Run traversal (bfs_steps or dfs_steps) over every connected component
+
+    The component containing start goes first, then each still-unvisited
+    node in id order roots the next one. All components share one visited
+    set, so the whole graph is covered in O(V + E). Inner initialize and
+    complete steps are relabelled component_start/component_complete, and
+    the final complete step carries a per-component summary with step
+    ranges ([first, last) indexes into steps).
+    """
+    steps = []
+    visited = set()
+    components = []
+    roots = [start] if 0 <= start < len(graph) else []
+    
+    for root in roots + list(range(len(graph))):
+        if root in visited:
+            continue
+        
+        component_id = len(components)
+        first_step = len(steps)
+        before = len(visited)
+        component_steps = traversal(graph, root, visited)
+        
+        component_steps[0]['component'] = component_id
+        if component_id > 0:
+            component_steps[0]['type'] = 'component_start'
+            component_steps[0]['description'] = (
+                f'Start component {component_id} at unvisited node {root}')
+        component_steps[-1].update({
+            'type': 'component_complete',
+            'component': component_id,
+            'description': f'Component {component_id} complete: '
+                           f'{len(visited) - before} nodes'
+        })
+        steps.extend(component_steps)
+        
+        components.append({
+            'id': component_id,
+            'root': root,
+            'size': len(visited) - before,
+            'step_range': [first_step, len(steps)]
+        })
+    
+    sizes = [component['size'] for component in components]
+    steps.append({
+        'type': 'complete',
+        'current': None,
+        'visited_count': len(visited),
+        'components': components,
+        'stats': {
+            'component_count': len(components),
+            'largest_component': max(sizes, default=0),
+            'isolated_nodes': sizes.count(1)
+        },
+        'pseudocode_line': 'traversal complete',
+        'description': f'Traversed all {len(components)} components'
+    })
+    
+    return steps
+
+def shortest_path_steps(graph, start, target=None, heuristic=None, frontier='heap'):
+    """Generate weighted shortest-path steps (Dijkstra, or A* with a heuristic)
+
+    The frontier is a binary heap with lazy deletion: relaxing a node pushes
+    a new entry rather than decreasing its key, and outdated entries are
+    skipped when popped. frontier='scan' instead selects the closest open
+    node with a linear scan, which is O(V^2) and only kept for benchmarks.
+    """
+    steps = []
+    name = 'A*' if heuristic else 'Dijkstra'
+    h = heuristic or (lambda node: 0)
+    dist = {start: 0}
+    previous = {}
+    settled = set()
+    heap = [(h(start), start)]
+    open_nodes = {start: h(start)}  # used by the linear-scan frontier
+    
+    steps.append({
+        'type': 'initialize',
+        'current': None,
+        'pushed': start,
+        'distance': 0,
+        'pseudocode_line': f'dist[{start}] = 0, pq = [({start}, 0)]',
+        'description': f'Initialize {name} with start node {start}'
+    })
+    
+    while heap if frontier == 'heap' else open_nodes:
+        if frontier == 'heap':
+            _, current = heapq.heappop(heap)
+        else:
+            current = min(open_nodes, key=open_nodes.get)
+            del open_nodes[current]
+        
+        if current in settled:
+            # Lazy deletion: a shorter entry for this node was already settled
+            steps.append({
+                'type': 'skip',
+                'current': current,
+                'popped': current,
+                'pseudocode_line': f'if {current} in settled: continue',
+                'description': f'Skip outdated queue entry for node {current}'
+            })
+            continue
+        
+        settled.add(current)
+        steps.append({
+            'type': 'pop',
+            'current': current,
+            'popped': current,
+            'visited_node': current,
+            'distance': dist[current],
+            'pseudocode_line': f'current = pq.pop() = {current}',
+            'description': f'Settle node {current} at distance {dist[current]:g}'
+        })
+        
+        if current == target:
+            break
+        
+        neighbors = graph.neighbors(current)
+        weights = graph.edge_weights(current)
+        for i in range(len(neighbors)):
+            neighbor = neighbors[i]
+            if neighbor in settled:
+                continue
+            candidate = dist[current] + weights[i]
+            if candidate < dist.get(neighbor, float('inf')):
+                old = dist.get(neighbor)
+                dist[neighbor] = candidate
+                previous[neighbor] = current
+                if frontier == 'heap':
+                    heapq.heappush(heap, (candidate + h(neighbor), neighbor))
+                else:
+                    open_nodes[neighbor] = candidate + h(neighbor)
+                
+                steps.append({
+                    'type': 'relax',
+                    'current': current,
+                    'neighbor': neighbor,
+                    'pushed': neighbor,
+                    'distance': candidate,
+                    'previous_distance': old,
+                    'pseudocode_line': f'dist[{neighbor}] = {candidate:g}; pq.push({neighbor})',
+                    'description': f'Relax edge {current}-{neighbor}: distance {candidate:g}'
+                })
+    
+    path = []
+    if target is not None and target in settled:
+        node = target
+        while node != start:
+            path.append(node)
+            node = previous[node]
+        path.append(start)
+        path.reverse()
+    
+    steps.append({
+        'type': 'complete',
+        'current': None,
+        'visited_count': len(settled),
+        'path': path,
+        'distance': dist.get(target) if target is not None else None,
+        'pseudocode_line': f'{name} complete',
+        'description': f'{name} completed'
+            + (f': distance to {target} is {dist[target]:g}' if path else '')
+    })
+    
+    return steps
+
+def dijkstra_steps(graph, start, target=None, frontier='heap'):
+    """Generate Dijkstra shortest-path steps"""
+    return shortest_path_steps(graph, start, target, frontier=frontier)
+
+def astar_steps(graph, start, target):
+    """Generate A* shortest-path steps
+
+    Nodes carry no coordinates, so the heuristic is the hop distance to the
+    target times the smallest edge weight: never more than the true
+    distance, hence admissible and consistent.
+    """
+    hops = {target: 0}
+    queue = deque([target])
+    while queue:
+        node = queue.popleft()
+        for neighbor in graph.neighbors(node):
+            if neighbor not in hops:
+                hops[neighbor] = hops[node] + 1
+                queue.append(neighbor)
+    
+    min_weight = min(graph.weights) if graph.weights else 1
+    
+    def heuristic(node):
+        # Nodes that cannot reach the target are never worth expanding
+        if node not in hops:
+            return float('inf')
+        return hops[node] * min_weight
+    
+    return shortest_path_steps(graph, start, target, heuristic=heuristic)
+
@@ -1,15 +1,35 @@
 import os
+import tempfile
 from flask import Flask
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 # create the app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_UPLOAD_BYTES", 32 * 1024 * 1024))  # bulk graph/array uploads
+app.config["MAX_GRAPH_NODES"] = int(os.environ.get("MAX_GRAPH_NODES", 1_000_000))
+app.config["TRACE_STORE_DIR"] = os.environ.get("TRACE_STORE_DIR", os.path.join(tempfile.gettempdir(), "algoviz-traces"))
+app.config["TRACE_STORE_TTL"] = int(os.environ.get("TRACE_STORE_TTL", 3600))  # seconds
+app.config["TRACE_STORE_MAX_BYTES"] = int(os.environ.get("TRACE_STORE_MAX_BYTES", 512 * 1024 * 1024))
+app.config["TRACE_SPILL_MIN_STEPS"] = int(os.environ.get("TRACE_SPILL_MIN_STEPS", 10000))
+app.config["COMPRESS_MIN_BYTES"] = int(os.environ.get("COMPRESS_MIN_BYTES", 2048))
+app.config["WARM_CACHE"] = os.environ.get("WARM_CACHE", "1") != "0"  # precompute preset traces at startup
+app.config["WARM_PRESETS_FILE"] = os.environ.get("WARM_PRESETS_FILE")
+app.config["ADMISSION_STEP_UNIT"] = int(os.environ.get("ADMISSION_STEP_UNIT", 10000))  # estimated steps per unit of request weight
+app.config["RATE_LIMIT_PER_SECOND"] = float(os.environ.get("RATE_LIMIT_PER_SECOND", 10))  # weight units per client; 0 disables
+app.config["RATE_LIMIT_BURST"] = int(os.environ.get("RATE_LIMIT_BURST", 200))  # also the heaviest single request
+app.config["MAX_CONCURRENT_COST"] = int(os.environ.get("MAX_CONCURRENT_COST", 400))  # total weight generating at once; 0 disables
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.environ.get("TRUSTED_PROXIES", 1)), x_proto=1, x_host=1)
 
 # Import routes after app creation
 from routes import *
 
+# With gunicorn's preload_app this runs once in the master, before fork
+if app.config["WARM_CACHE"]:
+    from warmup import default_presets, load_presets, warm_preset_cache
+    preset_file = app.config["WARM_PRESETS_FILE"]
+    warm_preset_cache(app, load_presets(preset_file) if preset_file else default_presets())
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))  # default 5000 locally, dynamic on Render
     app.run(host="0.0.0.0", port=port, debug=False)
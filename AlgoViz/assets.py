@@ -0,0 +1,121 @@
+"""Static asset versioning and response compression
+
+Static URLs built with url_for('static', ...) get a ?v=<content hash>
+suffix so they can be cached for a year. Precompressed .br/.gz siblings
+written by ``python assets.py`` are served when the client accepts them,
+and JSON API responses above COMPRESS_MIN_BYTES are compressed on the fly.
+Brotli is optional; without the package only gzip is used.
+"""
+import functools
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+
+from flask import request, send_from_directory
+from app import app
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ONE_YEAR = 365 * 24 * 3600
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+PRECOMPRESSED_TYPES = ('.js', '.css', '.html', '.svg', '.json')
+
+def available_encodings():
+    """Content codings this process can produce, preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def negotiate_encoding():
+    """Best content coding accepted by the current request, or None"""
+    return request.accept_encodings.best_match(available_encodings())
+
+def compress(data, encoding, best=False):
+    """Compress bytes with the given content coding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if best else 5)
+    return gzip.compress(data, compresslevel=9 if best else 6)
+
+@functools.lru_cache(maxsize=256)
+def _file_hash(path, mtime):
+    with open(path, 'rb') as file:
+        return hashlib.md5(file.read()).hexdigest()[:12]
+
+def static_file_hash(filename):
+    """Short content hash of a file under the static folder"""
+    path = os.path.join(app.static_folder, filename)
+    try:
+        return _file_hash(path, os.path.getmtime(path))
+    except OSError:
+        return None
+
+@app.url_defaults
+def hashed_static_url(endpoint, values):
+    """Append the content hash to static asset URLs"""
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        file_hash = static_file_hash(values['filename'])
+        if file_hash:
+            values['v'] = file_hash
+
+def send_static_asset(filename):
+    """Static file view serving precompressed variants when possible"""
+    # Versioned URLs never change content, so they can be cached for good
+    max_age = ONE_YEAR if request.args.get('v') else None
+    path = os.path.join(app.static_folder, filename)
+    encoding = negotiate_encoding()
+    if encoding and os.path.isfile(path):
+        variant = path + ENCODING_SUFFIXES[encoding]
+        if os.path.isfile(variant) and os.path.getmtime(variant) >= os.path.getmtime(path):
+            response = send_from_directory(app.static_folder, filename + ENCODING_SUFFIXES[encoding],
+                                           mimetype=mimetypes.guess_type(filename)[0],
+                                           max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            if max_age:
+                response.cache_control.immutable = True
+            return response
+
+    response = send_from_directory(app.static_folder, filename, max_age=max_age)
+    if max_age:
+        response.cache_control.immutable = True
+    return response
+
+app.view_functions['static'] = send_static_asset
+
+@app.after_request
+def compress_api_response(response):
+    """Compress large JSON responses on the fly"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.content_length is None or response.content_length < app.config['COMPRESS_MIN_BYTES']:
+        return response
+    encoding = negotiate_encoding()
+    if encoding:
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def build_precompressed(static_folder):
+    """Write .gz (and .br when brotli is installed) next to each text asset"""
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.endswith(PRECOMPRESSED_TYPES):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as file:
+                data = file.read()
+            for encoding in available_encodings():
+                with open(path + ENCODING_SUFFIXES[encoding], 'wb') as file:
+                    file.write(compress(data, encoding, best=True))
+            print(f'compressed {os.path.relpath(path, static_folder)}')
+    if brotli is None:
+        print('brotli is not installed; only .gz variants were written', file=sys.stderr)
+
+if __name__ == '__main__':
+    build_precompressed(app.static_folder)
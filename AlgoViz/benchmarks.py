@@ -0,0 +1,127 @@
+"""Rough timing comparisons for the step generators
+
+Run with ``python benchmarks.py``. Each benchmark prints wall-clock time per
+variant so regressions in the hot paths are easy to spot.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from algorithms import (FIBONACCI_STRATEGIES, LAYOUT_EXACT_MAX_NODES, LAYOUT_ITERATIONS,
+                        bubble_sort_steps, build_graph, counting_sort_steps, dijkstra_steps,
+                        fibonacci_call_tree, force_directed_layout, heap_sort_steps,
+                        insertion_sort_steps, merge_sort_bottom_up_steps, merge_sort_steps,
+                        quick_sort_steps, radix_sort_steps, shell_sort_steps)
+
+IMPORT_TIME_BUDGET_MS = 300
+
+def time_call(func, *args, **kwargs):
+    """Return (seconds, result) for a single call"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def trace_kb(steps):
+    """Serialized JSON size of a trace in kilobytes"""
+    return len(json.dumps(steps)) // 1024
+
+def random_sparse_graph(nodes_count, edges_per_node=4, seed=0):
+    """Build a random weighted graph with about edges_per_node * V edges"""
+    rng = random.Random(seed)
+    edges = [(rng.randrange(nodes_count), rng.randrange(nodes_count))
+             for _ in range(nodes_count * edges_per_node)]
+    weights = [rng.randint(1, 20) for _ in edges]
+    return build_graph(nodes_count, edges, weights)
+
+def benchmark_shortest_path_frontier(sizes=(500, 2000, 8000)):
+    """Heap with lazy deletion vs. linear-scan frontier selection"""
+    print('Dijkstra frontier selection (heap vs. scan)')
+    for nodes_count in sizes:
+        graph = random_sparse_graph(nodes_count)
+        heap_time, _ = time_call(dijkstra_steps, graph, 0)
+        scan_time, _ = time_call(dijkstra_steps, graph, 0, frontier='scan')
+        print(f'  V={nodes_count:>6}  heap {heap_time:8.3f}s  scan {scan_time:8.3f}s')
+
+def benchmark_merge_sort_variants(sizes=(128, 256, 512), seed=0):
+    """Top-down merge sort vs. bottom-up with a reused auxiliary buffer"""
+    print('Merge sort (top-down vs. bottom-up)')
+    rng = random.Random(seed)
+    for n in sizes:
+        data = [rng.randint(0, 1000) for _ in range(n)]
+        top_time, top_steps = time_call(merge_sort_steps, data.copy())
+        bottom_time, bottom_steps = time_call(merge_sort_bottom_up_steps, data.copy())
+        print(f'  n={n:>6}  top-down {top_time:8.3f}s {trace_kb(top_steps):>8} KB'
+              f'  bottom-up {bottom_time:8.3f}s {trace_kb(bottom_steps):>8} KB')
+
+def benchmark_sorting_algorithms(n=300, seed=0):
+    """Step counts and generation time for every sorting algorithm"""
+    print(f'Sorting algorithms on {n} random values')
+    rng = random.Random(seed)
+    data = [rng.randint(0, 1000) for _ in range(n)]
+    generators = {
+        'bubble': bubble_sort_steps,
+        'insertion': insertion_sort_steps,
+        'merge': merge_sort_steps,
+        'quick': quick_sort_steps,
+        'heap': heap_sort_steps,
+        'shell': shell_sort_steps,
+        'counting': counting_sort_steps,
+        'radix': radix_sort_steps,
+    }
+    for name, generator in generators.items():
+        elapsed, steps = time_call(generator, data.copy())
+        print(f'  {name:<10} {len(steps):>8} steps  {elapsed:8.3f}s')
+
+def benchmark_fibonacci_strategies(sizes=(15, 20, 25)):
+    """Call-tree size for naive, memoized and bottom-up fibonacci"""
+    print('Fibonacci call trees (naive vs. memo vs. bottomup)')
+    for n in sizes:
+        row = []
+        for strategy in FIBONACCI_STRATEGIES:
+            elapsed, tree = time_call(fibonacci_call_tree, n, strategy)
+            suffix = '+' if tree['truncated'] else ' '
+            row.append(f'{strategy} {tree["calls"]:>7}{suffix} calls {elapsed:6.3f}s')
+        print(f'  n={n:>4}  ' + '  '.join(row))
+
+def benchmark_graph_layout(sizes=(500, 2000, 8000)):
+    """Force-directed layout time; exact repulsion up to LAYOUT_EXACT_MAX_NODES, grid above"""
+    print(f'Force-directed layout ({LAYOUT_ITERATIONS} iterations)')
+    for nodes_count in sizes:
+        graph = random_sparse_graph(nodes_count, edges_per_node=2)
+        elapsed, _ = time_call(force_directed_layout, graph)
+        method = 'exact' if nodes_count <= LAYOUT_EXACT_MAX_NODES else 'grid'
+        print(f'  V={nodes_count:>6}  {method:<5} {elapsed:8.3f}s')
+
+def benchmark_import_time(module='app', budget_ms=IMPORT_TIME_BUDGET_MS):
+    """Cold import time of the web app in a fresh interpreter
+
+    This is what every gunicorn worker (re)spawn pays before serving;
+    algorithm modules and NumPy should not show up here. Preset warming is
+    switched off since it runs once in the preloading master, not per worker.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=dict(os.environ, WARM_CACHE='0'))
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, total, name = line[len('import time:'):].split('|')
+            cumulative[name.strip()] = int(total) / 1000
+    total_ms = cumulative.get(module, 0.0)
+    status = 'ok' if total_ms <= budget_ms else 'OVER BUDGET'
+    print(f'Import time of {module}: {total_ms:.1f} ms (budget {budget_ms} ms) {status}')
+    for name in ('algorithms', 'numpy'):
+        if name in cumulative:
+            print(f'  {name} was imported eagerly ({cumulative[name]:.1f} ms)')
+
+if __name__ == '__main__':
+    benchmark_import_time()
+    benchmark_shortest_path_frontier()
+    benchmark_merge_sort_variants()
+    benchmark_sorting_algorithms()
+    benchmark_fibonacci_strategies()
+    benchmark_graph_layout()
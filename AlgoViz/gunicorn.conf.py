@@ -0,0 +1,3 @@
+# Import the app (and warm the preset cache) once in the master; workers
+# fork with the cached traces already in memory and start serving at once
+preload_app = True
@@ -0,0 +1,241 @@
+"""Algorithm registry
+
+Maps (category, algorithm) to its step generator, complexity metadata,
+option parser and step-count estimate. Generators are named as
+'module:function' and only imported the first time they are used, so
+importing the web app (and every gunicorn worker spawn) does not pay for
+the algorithm modules or NumPy.
+"""
+import importlib
+
+class AlgorithmEntry:
+    """One registered algorithm"""
+
+    def __init__(self, category, name, generator, complexity, parser=None,
+                 variants=None, variant_complexity=None, title=None, cost=None,
+                 variant_cost=None, variant_max_size=None):
+        self.category = category
+        self.name = name
+        self.title = title or name
+        self.complexity = complexity
+        self.parser = parser
+        self.cost = cost or linear
+        self.variants = dict(variants or {})
+        self.variant_complexity = dict(variant_complexity or {})
+        self.variant_cost = dict(variant_cost or {})
+        self.variant_max_size = dict(variant_max_size or {})
+        self._targets = {None: generator, **self.variants}
+        self._loaded = {}
+
+    def load(self, variant=None):
+        """Import (once) and return the generator for a variant"""
+        if variant not in self._targets:
+            raise ValueError(f'Unknown {self.title} variant: {variant}')
+        function = self._loaded.get(variant)
+        if function is None:
+            module_name, _, attribute = self._targets[variant].partition(':')
+            function = getattr(importlib.import_module(module_name), attribute)
+            self._loaded[variant] = function
+        return function
+
+    def parse(self, options):
+        """Turn request options into generator keyword arguments"""
+        return self.parser(options) if self.parser else {}
+
+    def get_complexity(self, variant=None):
+        return self.variant_complexity.get(variant, self.complexity)
+
+    def estimate_steps(self, size, variant=None):
+        """Rough number of steps generated for an input of the given size"""
+        return self.variant_cost.get(variant, self.cost)(max(size, 1))
+
+REGISTRY = {}
+
+def register(category, name, generator, complexity, parser=None,
+             variants=None, variant_complexity=None, title=None, cost=None,
+             variant_cost=None, variant_max_size=None):
+    """Add an algorithm to the registry"""
+    REGISTRY[category, name] = AlgorithmEntry(category, name, generator, complexity,
+                                              parser, variants, variant_complexity, title, cost,
+                                              variant_cost, variant_max_size)
+
+def lookup(category, name):
+    """Return the AlgorithmEntry for (category, name), or None"""
+    return REGISTRY.get((category, name))
+
+def algorithm_names(category):
+    """Registered algorithm names in a category, in registration order"""
+    return [name for entry_category, name in REGISTRY if entry_category == category]
+
+def int_option(options, name, default):
+    value = options.get(name, default)
+    if not str(value).lstrip('-').isdigit():
+        raise ValueError(f'{name} must be an integer')
+    return int(value)
+
+# Step-count growth (admission control weighs requests with these)
+
+def linear(n):
+    return n
+
+def linearithmic(n):
+    return n * n.bit_length()
+
+def quadratic(n):
+    return n * n
+
+def exponential(n):
+    return 2 ** min(n, 64)
+
+# Standard recursion steps copy the whole call stack, so they are priced in
+# stack frames: steps × maximum depth
+
+def call_stack(steps_per_call):
+    def cost(n):
+        return steps_per_call * n * n
+    return cost
+
+def exponential_call_stack(n):
+    return n * 2 ** (min(n, 64) + 2)
+
+# Linear traces and event logs do not copy the stack
+LINEAR_TRACES = {'long': linear, 'trace': linear, 'long_trace': linear, 'tree': linear}
+
+# Option parsers
+
+def sort_options(options):
+    return {'detail': options.get('detail', 'full')}
+
+def quick_sort_options(options):
+    seed = options.get('seed')
+    if seed is not None and not str(seed).lstrip('-').isdigit():
+        raise ValueError('seed must be an integer')
+    return {
+        'pivot': options.get('pivot', 'last'),
+        'partition_scheme': options.get('partition', 'lomuto'),
+        'seed': None if seed is None else int(seed),
+        'detail': options.get('detail', 'full')
+    }
+
+def shell_sort_options(options):
+    return {'gaps': options.get('gaps', 'ciura'), 'detail': options.get('detail', 'full')}
+
+def number_option(default, minimum=None, maximum=None):
+    def parse(options):
+        n = int_option(options, 'n', default)
+        if minimum is not None and n < minimum:
+            raise ValueError(f'n must be at least {minimum}')
+        if maximum is not None and n > maximum:
+            raise ValueError(f'n must be at most {maximum}')
+        return {'n': n}
+    return parse
+
+def text_options(options):
+    return {'text': options.get('text', 'hello')}
+
+def target_options(options):
+    return {'target': options.get('target')}
+
+def required_target_options(options):
+    if options.get('target') is None:
+        raise ValueError('A* requires a target node')
+    return {'target': options['target']}
+
+# Sorting
+
+register('sorting', 'bubble', 'algorithms:bubble_sort_steps',
+         {'time_best': 'O(n)', 'time_avg': 'O(n²)', 'time_worst': 'O(n²)', 'space': 'O(1)'},
+         sort_options, cost=quadratic)
+register('sorting', 'selection', 'algorithms:selection_sort_steps',
+         {'time_best': 'O(n²)', 'time_avg': 'O(n²)', 'time_worst': 'O(n²)', 'space': 'O(1)'},
+         sort_options, cost=quadratic)
+register('sorting', 'insertion', 'algorithms:insertion_sort_steps',
+         {'time_best': 'O(n)', 'time_avg': 'O(n²)', 'time_worst': 'O(n²)', 'space': 'O(1)'},
+         sort_options, cost=quadratic)
+register('sorting', 'merge', 'algorithms:merge_sort_steps',
+         {'time_best': 'O(n log n)', 'time_avg': 'O(n log n)', 'time_worst': 'O(n log n)', 'space': 'O(n)'},
+         sort_options, cost=linearithmic,
+         variants={'topdown': 'algorithms:merge_sort_steps',
+                   'bottomup': 'algorithms:merge_sort_bottom_up_steps'},
+         title='merge sort')
+register('sorting', 'quick', 'algorithms:quick_sort_steps',
+         {'time_best': 'O(n log n)', 'time_avg': 'O(n log n)', 'time_worst': 'O(n²)', 'space': 'O(log n)'},
+         quick_sort_options, cost=linearithmic)
+register('sorting', 'heap', 'algorithms:heap_sort_steps',
+         {'time_best': 'O(n log n)', 'time_avg': 'O(n log n)', 'time_worst': 'O(n log n)', 'space': 'O(1)'},
+         sort_options, cost=linearithmic)
+register('sorting', 'shell', 'algorithms:shell_sort_steps',
+         {'time_best': 'O(n log n)', 'time_avg': 'O(n^1.25)', 'time_worst': 'O(n^1.5)', 'space': 'O(1)'},
+         shell_sort_options, cost=linearithmic)
+register('sorting', 'counting', 'algorithms:counting_sort_steps',
+         {'time_best': 'O(n + k)', 'time_avg': 'O(n + k)', 'time_worst': 'O(n + k)', 'space': 'O(n + k)'},
+         sort_options)
+register('sorting', 'radix', 'algorithms:radix_sort_steps',
+         {'time_best': 'O(d·(n + b))', 'time_avg': 'O(d·(n + b))', 'time_worst': 'O(d·(n + b))', 'space': 'O(n + b)'},
+         sort_options)
+
+# Trees
+
+for traversal in ('inorder', 'preorder', 'postorder'):
+    register('trees', traversal, f'algorithms:{traversal}_traversal_steps',
+             {'time': 'O(n)', 'space': 'O(h)'})
+
+# Recursion ('trace' and 'long_trace' variants return the RecursionTrace behind format=events)
+
+TOWER_MAX_N = 12  # 2^12 moves, about 8 MB of standard steps
+# Linear traces emit about 500 bytes per frame, so cap them near 10 MB
+LONG_TRACE_LIMITS = {'long': 20_000, 'long_trace': 20_000}
+
+register('recursion', 'factorial', 'algorithms:factorial_steps',
+         {'time': 'O(n)', 'space': 'O(n)'}, number_option(5), cost=call_stack(3),
+         variants={'long': 'algorithms:factorial_long_steps',
+                   'trace': 'algorithms:factorial_trace',
+                   'long_trace': 'algorithms:factorial_long_trace'},
+         variant_cost=LINEAR_TRACES, variant_max_size=LONG_TRACE_LIMITS)
+register('recursion', 'fibonacci', 'algorithms:fibonacci_steps',
+         {'time': 'O(2^n)', 'space': 'O(n)'}, number_option(5), cost=call_stack(4),
+         variants={'trace': 'algorithms:fibonacci_trace',
+                   'tree': 'algorithms:fibonacci_call_tree'},
+         variant_complexity={'naive': {'time': 'O(2^n)', 'space': 'O(n)'},
+                             'memo': {'time': 'O(n)', 'space': 'O(n)'},
+                             'bottomup': {'time': 'O(n)', 'space': 'O(1)'}},
+         variant_cost=LINEAR_TRACES)
+register('recursion', 'tower', 'algorithms:tower_of_hanoi_steps',
+         {'time': 'O(2^n)', 'space': 'O(n)'}, number_option(3, minimum=1, maximum=TOWER_MAX_N),
+         cost=exponential_call_stack,
+         variants={'trace': 'algorithms:tower_of_hanoi_trace'},
+         variant_cost={'trace': exponential})
+register('recursion', 'reverse', 'algorithms:reverse_string_steps',
+         {'time': 'O(n)', 'space': 'O(n)'}, text_options, cost=call_stack(3),
+         variants={'long': 'algorithms:reverse_string_long_steps',
+                   'trace': 'algorithms:reverse_string_trace',
+                   'long_trace': 'algorithms:reverse_string_long_trace'},
+         variant_cost=LINEAR_TRACES, variant_max_size=LONG_TRACE_LIMITS)
+
+def recursion_variant(entry, size, options):
+    """Generator variant serving a recursion request (None for standard steps)
+
+    fibonacci's strategy option selects the call tree; factorial and reverse
+    switch to their linear traces for mode=long, and for mode=auto above
+    LONG_INPUT_THRESHOLD; format=events selects the event-log variants.
+    """
+    if options.get('strategy') is not None and 'tree' in entry.variants:
+        return 'tree'
+    from algorithms import LONG_INPUT_THRESHOLD
+    mode = options.get('mode', 'auto')
+    use_long = 'long' in entry.variants and (
+        mode == 'long' or (mode == 'auto' and size > LONG_INPUT_THRESHOLD))
+    if options.get('format', 'steps') == 'events':
+        return 'long_trace' if use_long else 'trace'
+    return 'long' if use_long else None
+
+# Graphs
+
+register('graphs', 'bfs', 'algorithms:bfs_steps',
+         {'time': 'O(V + E)', 'space': 'O(V)'})
+register('graphs', 'dfs', 'algorithms:dfs_steps',
+         {'time': 'O(V + E)', 'space': 'O(V)'})
+register('graphs', 'dijkstra', 'algorithms:dijkstra_steps',
+         {'time': 'O((V + E) log V)', 'space': 'O(V + E)'}, target_options)
+register('graphs', 'astar', 'algorithms:astar_steps',
+         {'time': 'O((V + E) log V)', 'space': 'O(V + E)'}, required_target_options)
@@ -1,6 +1,23 @@
-from flask import render_template, jsonify, request
+import functools
+import hashlib
+import math
+from collections import OrderedDict
+
+from flask import render_template, jsonify, request, g, Response, send_file
 from app import app
-from algorithms import *
+from registry import lookup, recursion_variant
+from trace_store import TraceStore
+from assets import ENCODING_SUFFIXES, compress, negotiate_encoding
+from warmup import PRESET_CACHE
+from admission import admitted
+
+trace_store = TraceStore(app.config['TRACE_STORE_DIR'],
+                         ttl=app.config['TRACE_STORE_TTL'],
+                         max_bytes=app.config['TRACE_STORE_MAX_BYTES'])
+
+# Edge-set digest -> node positions, least recently used first
+LAYOUT_CACHE_SIZE = 64
+layout_cache = OrderedDict()
 
 @app.route('/')
 def index():
@@ -27,100 +44,462 @@ def graphs():
     """Graph traversal visualizer page"""
     return render_template('graphs.html')
 
+def unseeded_random(args):
+    """True when generated input or the quick sort pivot is random without a seed"""
+    return 'seed' not in args and ('generate' in args or args.get('pivot') == 'random')
+
+def stored_trace(view):
+    """Serve a GET trace endpoint from the preset cache or disk store when possible
+
+    Presets warmed at startup are answered from memory. Other identical
+    requests (ignoring spill) reuse a trace spilled by any worker; otherwise
+    the view runs and trace_response may spill its result. Requests drawing
+    unseeded random numbers bypass both caches.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if unseeded_random(request.args):
+            return view(*args, **kwargs)
+        key = TraceStore.key(request.path, [(name, value) for name, value
+                                            in request.args.items(multi=True)
+                                            if name != 'spill'])
+        bodies = PRESET_CACHE.get(key)
+        if bodies is not None:
+            return preset_response(bodies)
+        trace = trace_store.open(key)
+        if trace is not None:
+            return stored_trace_response(key, trace)
+        g.trace_key = key
+        return view(*args, **kwargs)
+    return wrapper
+
+def trace_response(payload):
+    """jsonify a {'steps': ..., ...} payload, spilling large traces to disk"""
+    steps = payload.get('steps')
+    key = g.get('trace_key')
+    if key is None or steps is None or len(steps) < app.config['TRACE_SPILL_MIN_STEPS']:
+        return jsonify(payload)
+    meta = {name: value for name, value in payload.items() if name != 'steps'}
+    return stored_trace_response(key, trace_store.put(key, steps, meta))
+
+def preset_response(bodies):
+    """Serve a warmed preset body, precompressed when the client accepts it"""
+    encoding = negotiate_encoding()
+    response = Response(bodies.get(encoding, bodies[None]), mimetype='application/json')
+    if encoding in bodies:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def stored_trace_response(key, trace):
+    """Full trace body from the store, or only its handle when spill=1"""
+    with trace:
+        if request.args.get('spill') == '1':
+            return jsonify(dict(trace.meta, trace_id=key, total=trace.count))
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return Response(trace.response_json(), mimetype='application/json')
+        # Compressed bodies are cached next to the trace file
+        body = trace_store.encoded_body(key, trace, ENCODING_SUFFIXES[encoding],
+                                        lambda data: compress(data, encoding))
+    response = Response(body, mimetype='application/json')
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def run_sorting_algorithm(algorithm, arr, options):
+    """Dispatch an input array to the registered sorting step generator
+
+    options is a mapping (query args or JSON body) holding the per-algorithm
+    settings: detail, variant, pivot, partition, seed and gaps.
+    """
+    entry = lookup('sorting', algorithm)
+    if entry is None:
+        return jsonify({'error': 'Unknown algorithm'}), 400
+    
+    try:
+        generator = entry.load(options.get('variant') if entry.variants else None)
+        steps = generator(arr.copy(), **entry.parse(options))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    return trace_response({
+        'steps': steps,
+        'complexity': entry.complexity
+    })
+
+def generate_from_options(options):
+    """Build a server-side input from generate/size/seed options"""
+    from algorithms import generate_sorting_input
+    
+    size = options.get('size', 8)
+    seed = options.get('seed')
+    if not str(size).isdigit() or (seed is not None and not str(seed).lstrip('-').isdigit()):
+        raise ValueError('size and seed must be integers')
+    return generate_sorting_input(options['generate'], int(size),
+                                  None if seed is None else int(seed))
+
 @app.route('/api/sort/<algorithm>')
+@stored_trace
+@admitted('sorting')
 def get_sorting_steps(algorithm):
     """API endpoint to get sorting algorithm steps"""
-    data = request.args.get('data', '64,34,25,12,22,11,90')
-    arr = [int(x.strip()) for x in data.split(',')]
-    
-    if algorithm == 'bubble':
-        steps = bubble_sort_steps(arr.copy())
-    elif algorithm == 'selection':
-        steps = selection_sort_steps(arr.copy())
-    elif algorithm == 'insertion':
-        steps = insertion_sort_steps(arr.copy())
-    elif algorithm == 'merge':
-        steps = merge_sort_steps(arr.copy())
-    elif algorithm == 'quick':
-        steps = quick_sort_steps(arr.copy())
+    try:
+        if 'generate' in request.args:
+            arr = generate_from_options(request.args)
+        else:
+            data = request.args.get('data', '64,34,25,12,22,11,90')
+            arr = [int(x.strip()) for x in data.split(',')]
+    except ValueError as error:
+        return jsonify({'error': f'Invalid array: {error}'}), 400
+    
+    return run_sorting_algorithm(algorithm, arr, request.args)
+
+def parse_sorting_upload():
+    """Parse a sorting input from a POST body
+
+    Accepts a JSON array, a JSON object ``{"data": [...], ...options}`` or
+    ``{"generate": "random|sorted|reversed|nearly_sorted", "size": n,
+    "seed": s, ...options}``, or an ``application/octet-stream`` body of
+    packed little-endian int32 values (options then come from the query
+    string).
+
+    Returns (arr, options) and raises ValueError with a user-facing message
+    on malformed input.
+    """
+    import numpy as np
+    from algorithms import MAX_SORTING_INPUT
+    
+    if request.mimetype == 'application/octet-stream':
+        body = request.get_data(cache=False)
+        if len(body) % 4:
+            raise ValueError('Body length must be a multiple of 4 bytes')
+        values = np.frombuffer(body, dtype='<i4')
+        options = request.args
     else:
-        return jsonify({'error': 'Unknown algorithm'}), 400
+        payload = request.get_json(silent=True)
+        if isinstance(payload, list):
+            payload = {'data': payload}
+        if not isinstance(payload, dict):
+            raise ValueError('Expected a JSON array or object, or an application/octet-stream body')
+        options = payload
+        if 'generate' in payload:
+            return generate_from_options(payload), options
+        data = payload.get('data', [])
+        # JSON booleans would otherwise coerce to 0/1
+        if isinstance(data, list) and any(isinstance(value, bool) for value in data):
+            raise ValueError('data must be a flat array of integers')
+        try:
+            values = np.asarray(data)
+        except ValueError:
+            raise ValueError('data must be a flat array of integers')
+        if values.ndim != 1 or (values.size and values.dtype.kind not in 'iu'):
+            raise ValueError('data must be a flat array of integers')
     
-    return jsonify({
-        'steps': steps,
-        'complexity': get_sorting_complexity(algorithm)
-    })
+    if not 0 < values.size <= MAX_SORTING_INPUT:
+        raise ValueError(f'Array must have between 1 and {MAX_SORTING_INPUT} elements')
+    
+    return values.tolist(), options
+
+@app.route('/api/sort/<algorithm>', methods=['POST'])
+@admitted('sorting')
+def post_sorting_steps(algorithm):
+    """API endpoint to get sorting algorithm steps for an uploaded or generated array"""
+    try:
+        arr, options = parse_sorting_upload()
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    return run_sorting_algorithm(algorithm, arr, options)
 
 @app.route('/api/tree/traversal/<traversal_type>')
+@stored_trace
+@admitted('trees', 'traversal_type')
 def get_tree_traversal(traversal_type):
     """API endpoint to get tree traversal steps"""
+    entry = lookup('trees', traversal_type)
+    if entry is None:
+        return jsonify({'error': 'Unknown traversal type'}), 400
+    
+    from algorithms import build_binary_tree
     tree_data = request.args.get('tree', '1,2,3,4,5,6,7')
     nodes = [int(x.strip()) if x.strip() != 'null' else None for x in tree_data.split(',')]
     
     tree = build_binary_tree(nodes)
+    steps = entry.load()(tree)
     
-    if traversal_type == 'inorder':
-        steps = inorder_traversal_steps(tree)
-    elif traversal_type == 'preorder':
-        steps = preorder_traversal_steps(tree)
-    elif traversal_type == 'postorder':
-        steps = postorder_traversal_steps(tree)
-    else:
-        return jsonify({'error': 'Unknown traversal type'}), 400
-    
-    return jsonify({
+    return trace_response({
         'steps': steps,
-        'complexity': {'time': 'O(n)', 'space': 'O(h)'}
+        'complexity': entry.complexity
     })
 
+RECURSION_MODES = ('auto', 'long', 'standard')
+
 @app.route('/api/recursion/<algorithm>')
+@stored_trace
+@admitted('recursion')
 def get_recursion_steps(algorithm):
-    """API endpoint to get recursion algorithm steps"""
-    if algorithm == 'factorial':
-        n = int(request.args.get('n', 5))
-        steps = factorial_steps(n)
-    elif algorithm == 'fibonacci':
-        n = int(request.args.get('n', 5))
-        steps = fibonacci_steps(n)
-    elif algorithm == 'tower':
-        n = int(request.args.get('n', 3))
-        steps = tower_of_hanoi_steps(n)
-    elif algorithm == 'reverse':
-        text = request.args.get('text', 'hello')
-        steps = reverse_string_steps(text)
+    """API endpoint to get recursion algorithm steps
+
+    format=events returns the compact call/return event log (frame args,
+    frame depths and [kind, frame_id, value] events) under 'trace' instead
+    of 'steps'. For factorial and reverse, mode=long switches to the
+    index-based linear trace (for events too); mode=auto (the default) does
+    so for inputs above LONG_INPUT_THRESHOLD, and mode=standard never does.
+    Standard step traces are limited to LONG_INPUT_THRESHOLD when a linear
+    trace exists, otherwise traces are limited to MAX_TRACED_DEPTH; linear
+    traces have their own per-algorithm limit. For fibonacci, strategy=naive|memo|bottomup
+    returns the compact call tree under 'tree' (naive capped at max_calls).
+    """
+    entry = lookup('recursion', algorithm)
+    if entry is None:
+        return jsonify({'error': 'Unknown algorithm'}), 400
+    
+    try:
+        args = entry.parse(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    mode = request.args.get('mode', 'auto')
+    if mode not in RECURSION_MODES:
+        return jsonify({'error': f'mode must be one of {", ".join(RECURSION_MODES)}'}), 400
+    size = args['n'] if 'n' in args else len(args['text'])
+    variant = recursion_variant(entry, size, request.args)
+    
+    if variant == 'tree':
+        from algorithms import FIBONACCI_CALL_BUDGET
+        max_calls = min(request.args.get('max_calls', FIBONACCI_CALL_BUDGET, type=int),
+                        FIBONACCI_CALL_BUDGET)
+        try:
+            tree = entry.load('tree')(args['n'], request.args['strategy'], max_calls)
+        except ValueError as error:
+            return jsonify({'error': str(error)}), 400
+        return jsonify({
+            'tree': tree,
+            'complexity': entry.get_complexity(request.args['strategy'])
+        })
+    
+    from algorithms import LONG_INPUT_THRESHOLD, MAX_TRACED_DEPTH
+    as_events = variant in ('trace', 'long_trace')
+    has_long = 'long' in entry.variants
+    max_size = LONG_INPUT_THRESHOLD if has_long and not as_events else MAX_TRACED_DEPTH
+    if variant in (None, 'trace') and size > max_size:
+        hint = '; use mode=long' if has_long else ''
+        return jsonify({'error': f'Input too large to trace (max {max_size}){hint}'}), 400
+    long_max = entry.variant_max_size.get(variant)
+    if long_max is not None and size > long_max:
+        return jsonify({'error': f'Input too large for mode=long (max {long_max})'}), 400
+    
+    if as_events:
+        trace = entry.load(variant)(**args)
+        if isinstance(trace, tuple):
+            trace = trace[0]  # fibonacci_trace also returns its memo
+        steps = trace.events()
     else:
+        steps = entry.load(variant)(**args)
+    
+    return trace_response({
+        'trace' if as_events else 'steps': steps,
+        'complexity': entry.complexity
+    })
+
+def graph_layout(graph):
+    """Force-directed node positions in [0, 1], cached by edge set
+
+    CSR graphs are deduplicated and sorted at build time, so the same edge
+    set hashes the same however its edges were ordered or uploaded.
+    """
+    import numpy as np
+    from algorithms import force_directed_layout
+    
+    digest = hashlib.sha256()
+    digest.update(np.asarray(graph.offsets, dtype=np.int64).tobytes())
+    digest.update(np.asarray(graph.targets, dtype=np.int64).tobytes())
+    key = digest.digest()
+    positions = layout_cache.get(key)
+    if positions is None:
+        positions = np.round(force_directed_layout(graph), 4).tolist()
+        layout_cache[key] = positions
+        while len(layout_cache) > LAYOUT_CACHE_SIZE:
+            layout_cache.popitem(last=False)
+    else:
+        layout_cache.move_to_end(key)
+    return positions
+
+def run_graph_traversal(algorithm, graph, start_node, target_node=None, scope='start'):
+    """Dispatch a built graph to the registered traversal
+
+    scope='all' walks every connected component instead of only the one
+    containing start_node (BFS/DFS only). With layout=1 the response also
+    carries server-computed node positions under 'layout'.
+    """
+    entry = lookup('graphs', algorithm)
+    if entry is None:
         return jsonify({'error': 'Unknown algorithm'}), 400
     
-    return jsonify({
+    try:
+        traversal = entry.load()
+        if scope == 'all':
+            if algorithm not in ('bfs', 'dfs'):
+                return jsonify({'error': 'scope=all is only supported for bfs and dfs'}), 400
+            from algorithms import whole_graph_steps
+            steps = whole_graph_steps(graph, traversal, start_node)
+        else:
+            steps = traversal(graph, start_node, **entry.parse({'target': target_node}))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    payload = {
         'steps': steps,
-        'complexity': get_recursion_complexity(algorithm)
-    })
+        'complexity': entry.complexity
+    }
+    if request.args.get('layout') in ('1', 'true'):
+        payload['layout'] = graph_layout(graph)
+    return trace_response(payload)
 
 @app.route('/api/graph/<algorithm>')
+@stored_trace
+@admitted('graphs')
 def get_graph_traversal(algorithm):
     """API endpoint to get graph traversal steps"""
-    # Expected format: "0-1,0-2,1-3,2-3" for edges
+    # Expected format: "0-1,0-2,1-3,2-3" for edges, "0-1:4,..." when weighted
     edges_data = request.args.get('edges', '0-1,0-2,1-3,2-3')
     nodes_count = int(request.args.get('nodes', 4))
     start_node = int(request.args.get('start', 0))
+    target_node = request.args.get('target', type=int)
     
     edges = []
+    weights = []
     if edges_data:
         for edge in edges_data.split(','):
             if '-' in edge:
-                u, v = map(int, edge.split('-'))
+                pair, _, weight = edge.partition(':')
+                try:
+                    u, v = map(int, pair.split('-'))
+                    weights.append(float(weight) if weight else 1.0)
+                except ValueError:
+                    return jsonify({'error': f'Malformed edge: {edge}'}), 400
                 edges.append((u, v))
     
-    graph = build_graph(nodes_count, edges)
+    if not all(math.isfinite(w) and w >= 0 for w in weights):
+        return jsonify({'error': 'Weights must be finite and non-negative'}), 400
+    # build_graph grows the graph to cover every endpoint
+    max_nodes = app.config['MAX_GRAPH_NODES']
+    if nodes_count > max_nodes or any(max(u, v) >= max_nodes for u, v in edges):
+        return jsonify({'error': f'Graphs are limited to {max_nodes} nodes'}), 400
+    
+    from algorithms import build_graph
+    graph = build_graph(nodes_count, edges, weights)
+    if target_node is not None and not 0 <= target_node < graph.nodes_count:
+        return jsonify({'error': 'target must be a valid node id'}), 400
+    return run_graph_traversal(algorithm, graph, start_node, target_node,
+                               request.args.get('scope', 'start'))
+
+def parse_edge_upload():
+    """Parse a bulk edge list from a POST body
+
+    Accepts either JSON ``{"nodes": n, "start": s, "edges": [[u, v], ...],
+    "weights": [...]}`` (edges may also be a flat ``[u, v, u, v, ...]`` list)
+    or an ``application/octet-stream`` body of packed little-endian int32
+    ``(u, v)`` records, or ``(u, v, float32 w)`` records with ``?weighted=1``.
+    For binary bodies ``nodes`` and ``start`` come from the query string.
+
+    An optional ``target`` (JSON field or query parameter) is used by the
+    shortest-path algorithms.
+
+    Returns (nodes_count, start_node, target_node, sources, targets, weights)
+    and raises ValueError with a user-facing message on malformed input.
+    """
+    import numpy as np
     
-    if algorithm == 'bfs':
-        steps = bfs_steps(graph, start_node)
-    elif algorithm == 'dfs':
-        steps = dfs_steps(graph, start_node)
+    if request.mimetype == 'application/octet-stream':
+        nodes_count = int(request.args.get('nodes', 0))
+        start_node = int(request.args.get('start', 0))
+        target_node = request.args.get('target', type=int)
+        fields = [('u', '<i4'), ('v', '<i4')]
+        if request.args.get('weighted') in ('1', 'true'):
+            fields.append(('w', '<f4'))
+        record = np.dtype(fields)
+        body = request.get_data(cache=False)
+        if len(body) % record.itemsize:
+            raise ValueError(f'Body length must be a multiple of {record.itemsize} bytes')
+        packed = np.frombuffer(body, dtype=record)
+        sources, targets = packed['u'], packed['v']
+        weights = packed['w'] if 'w' in record.names else None
     else:
-        return jsonify({'error': 'Unknown algorithm'}), 400
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            raise ValueError('Expected a JSON object or an application/octet-stream body')
+        nodes_count = int(payload.get('nodes', 0))
+        start_node = int(payload.get('start', 0))
+        target_node = payload.get('target')
+        if target_node is not None:
+            target_node = int(target_node)
+        try:
+            edges = np.asarray(payload.get('edges', []))
+        except ValueError:
+            raise ValueError('Edges must be [u, v] integer pairs')
+        flat = edges.ndim == 1 and edges.size % 2 == 0
+        if edges.size and (edges.dtype.kind not in 'iu' or not (flat or edges.shape[1:] == (2,))):
+            raise ValueError('Edges must be [u, v] integer pairs')
+        edges = edges.astype(np.int64).reshape(-1, 2)
+        sources, targets = edges[:, 0], edges[:, 1]
+        weights = payload.get('weights')
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != sources.shape:
+                raise ValueError('Expected one weight per edge')
     
-    return jsonify({
-        'steps': steps,
-        'complexity': {'time': 'O(V + E)', 'space': 'O(V)'}
-    })
+    if not 0 < nodes_count <= app.config['MAX_GRAPH_NODES']:
+        raise ValueError(f'nodes must be between 1 and {app.config["MAX_GRAPH_NODES"]}')
+    if not 0 <= start_node < nodes_count:
+        raise ValueError('start must be a valid node id')
+    if target_node is not None and not 0 <= target_node < nodes_count:
+        raise ValueError('target must be a valid node id')
+    if len(sources) and (min(sources.min(), targets.min()) < 0 or
+                         max(sources.max(), targets.max()) >= nodes_count):
+        raise ValueError(f'Edge endpoints must be in [0, {nodes_count})')
+    if weights is not None and not (np.isfinite(weights).all() and (weights >= 0).all()):
+        raise ValueError('Weights must be finite and non-negative')
+    
+    return nodes_count, start_node, target_node, sources, targets, weights
+
+@app.route('/api/graph/<algorithm>', methods=['POST'])
+@admitted('graphs')
+def post_graph_traversal(algorithm):
+    """API endpoint to get graph traversal steps for an uploaded edge list"""
+    try:
+        nodes_count, start_node, target_node, sources, targets, weights = parse_edge_upload()
+    except (TypeError, ValueError) as error:
+        return jsonify({'error': str(error)}), 400
+    
+    from algorithms import build_graph_from_arrays
+    graph = build_graph_from_arrays(nodes_count, sources, targets, weights)
+    return run_graph_traversal(algorithm, graph, start_node, target_node,
+                               request.args.get('scope', 'start'))
+
+@app.route('/api/trace/<trace_id>')
+def get_trace_slice(trace_id):
+    """Steps [start, start + count) of a spilled trace as a JSON array
+
+    The total step count is returned in the X-Trace-Total header.
+    """
+    trace = trace_store.open(trace_id) if trace_id.isalnum() else None
+    if trace is None:
+        return jsonify({'error': 'Unknown trace'}), 404
+    start = request.args.get('start', 0, type=int)
+    count = request.args.get('count', 1000, type=int)
+    with trace:
+        response = Response(trace.slice_json(start, start + count), mimetype='application/json')
+        response.headers['X-Trace-Total'] = str(trace.count)
+    return response
+
+@app.route('/api/trace/<trace_id>/file')
+def get_trace_file(trace_id):
+    """The raw trace file; supports HTTP Range requests"""
+    trace = trace_store.open(trace_id) if trace_id.isalnum() else None
+    if trace is None:
+        return jsonify({'error': 'Unknown trace'}), 404
+    trace.close()
+    return send_file(trace_store.path(trace_id), mimetype='application/octet-stream',
+                     conditional=True, max_age=app.config['TRACE_STORE_TTL'])
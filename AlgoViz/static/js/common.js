@@ -1,5 +1,10 @@
 // Common utility functions and classes for DSA Visualizer
 
+// Pages pass the versioned worker URL; otherwise resolve it next to this script
+const TRACE_WORKER_URL = document.currentScript
+    ? (document.currentScript.dataset.traceWorker || new URL('trace-worker.js', document.currentScript.src).href)
+    : null;
+
 /**
  * Animation controller for managing visualization steps
  */
@@ -10,13 +15,24 @@ class AnimationController {
         this.isPlaying = false;
         this.isPaused = false;
         this.speed = 5; // 1-10 scale
-        this.intervalId = null;
+        this.frameId = null;
+        this.lastFrameTime = null;
+        this.pendingSteps = 0;
         this.stepCallback = null;
+        this.applyCallback = null;
+        this.replayTarget = null; // seek target waiting on an evicted batch
     }
 
     setSteps(steps) {
         this.steps = steps;
         this.currentStep = -1;
+        this.replayTarget = null;
+        if (!Array.isArray(steps)) {
+            steps.onReceive = () => this.resumeReplay();
+        }
+        if (this.applyCallback) {
+            this.applyCallback(null);
+        }
         this.updateStepDisplay();
     }
 
@@ -24,17 +40,25 @@ class AnimationController {
         this.stepCallback = callback;
     }
 
+    // Optional: called for every step in order (and with null on rewind) so
+    // visualizers that accumulate state stay correct when several steps are
+    // applied in one frame. The step callback then only renders the last one.
+    setApplyCallback(callback) {
+        this.applyCallback = callback;
+    }
+
     setSpeed(speed) {
+        // The rate is read every frame, so playback picks this up immediately
         this.speed = Math.max(1, Math.min(10, speed));
-        if (this.isPlaying && !this.isPaused) {
-            this.pause();
-            this.play();
-        }
     }
 
-    getDelay() {
-        // Convert speed (1-10) to delay in milliseconds (2000-200)
-        return 2200 - (this.speed * 200);
+    getStepsPerSecond() {
+        // Speed 1 keeps one step every two seconds; speed 10 plays the whole
+        // trace in about FULL_SPEED_SECONDS (never slower than 5 steps/s).
+        // Speeds in between are spaced geometrically.
+        const slowest = 0.5;
+        const fastest = Math.max(5, this.steps.length / AnimationController.FULL_SPEED_SECONDS);
+        return slowest * Math.pow(fastest / slowest, (this.speed - 1) / 9);
     }
 
     play() {
@@ -42,59 +66,155 @@ class AnimationController {
         
         this.isPlaying = true;
         this.isPaused = false;
+        this.lastFrameTime = null;
+        this.pendingSteps = 0;
         
-        this.intervalId = setInterval(() => {
-            if (this.currentStep < this.steps.length - 1) {
-                this.nextStep();
-            } else {
-                this.stop();
+        if (this.frameId === null) {
+            this.frameId = requestAnimationFrame((time) => this.tick(time));
+        }
+    }
+
+    tick(time) {
+        this.frameId = null;
+        
+        if (this.lastFrameTime !== null) {
+            // Clamp long gaps (background tabs) so playback doesn't jump ahead
+            const elapsed = Math.min(time - this.lastFrameTime, 250);
+            this.pendingSteps += elapsed / 1000 * this.getStepsPerSecond();
+        }
+        this.lastFrameTime = time;
+        if (this.replayTarget !== null) {
+            // A rewind is still replaying; hold playback until it lands
+            this.pendingSteps = 0;
+        }
+        
+        const count = Math.floor(this.pendingSteps);
+        if (count > 0) {
+            this.pendingSteps -= count;
+            let target = Math.min(this.currentStep + count, this.steps.length - 1);
+            // Worker-backed traces stall at the first batch still in flight
+            let loaded = this.currentStep;
+            while (loaded < target && this.hasStep(loaded + 1)) {
+                loaded++;
+            }
+            if (loaded < target) {
+                this.pendingSteps = 0;
+                target = loaded;
             }
-        }, this.getDelay());
+            if (target > this.currentStep) {
+                this.seek(target);
+            }
+        }
+        this.prefetch(this.currentStep + 1);
+        
+        if (this.isAtEnd()) {
+            this.stop();
+        } else {
+            this.frameId = requestAnimationFrame((next) => this.tick(next));
+        }
+    }
+
+    cancelFrame() {
+        if (this.frameId !== null) {
+            cancelAnimationFrame(this.frameId);
+            this.frameId = null;
+        }
     }
 
     pause() {
         this.isPaused = true;
-        if (this.intervalId) {
-            clearInterval(this.intervalId);
-            this.intervalId = null;
-        }
+        this.cancelFrame();
     }
 
     stop() {
         this.isPlaying = false;
         this.isPaused = false;
-        if (this.intervalId) {
-            clearInterval(this.intervalId);
-            this.intervalId = null;
-        }
+        this.cancelFrame();
     }
 
     reset() {
         this.stop();
         this.currentStep = -1;
+        this.replayTarget = null;
+        if (this.applyCallback) {
+            this.applyCallback(null);
+        }
         this.updateStepDisplay();
         if (this.stepCallback) {
             this.stepCallback(null);
         }
     }
 
+    // steps is either a plain array or a WorkerTrace window
+    getStep(index) {
+        return Array.isArray(this.steps) ? this.steps[index] : this.steps.get(index);
+    }
+
+    hasStep(index) {
+        return Array.isArray(this.steps) || this.steps.has(index);
+    }
+
+    prefetch(index) {
+        if (!Array.isArray(this.steps) && index < this.steps.length) {
+            this.steps.prefetch(index);
+        }
+    }
+
+    seek(index) {
+        if (index < this.currentStep && this.applyCallback) {
+            // Accumulated state can't be undone; replay from the start
+            this.applyCallback(null);
+            this.currentStep = -1;
+        }
+        if (this.applyCallback) {
+            for (let i = this.currentStep + 1; i <= index; i++) {
+                const step = this.getStep(i);
+                if (step === undefined) {
+                    // Replay reached an evicted batch (get() re-requested it);
+                    // keep the partial state and resume when it arrives
+                    this.currentStep = i - 1;
+                    this.replayTarget = index;
+                    this.prefetch(i);
+                    return;
+                }
+                this.applyCallback(step);
+            }
+        } else if (index >= 0 && !this.hasStep(index)) {
+            this.getStep(index); // requests the evicted batch
+            this.replayTarget = index;
+            return;
+        }
+        
+        this.replayTarget = null;
+        this.currentStep = index;
+        this.updateStepDisplay();
+        if (this.stepCallback) {
+            this.stepCallback(index >= 0 ? this.getStep(index) : null);
+        }
+    }
+
+    resumeReplay() {
+        if (this.replayTarget === null) return;
+        const next = this.applyCallback ? this.currentStep + 1 : this.replayTarget;
+        if (this.hasStep(next)) {
+            this.seek(this.replayTarget);
+        }
+    }
+
     nextStep() {
+        if (this.replayTarget !== null) return;
         if (this.currentStep < this.steps.length - 1) {
-            this.currentStep++;
-            this.updateStepDisplay();
-            if (this.stepCallback) {
-                this.stepCallback(this.steps[this.currentStep]);
+            if (this.hasStep(this.currentStep + 1)) {
+                this.seek(this.currentStep + 1);
             }
+            this.prefetch(this.currentStep + 1);
         }
     }
 
     previousStep() {
-        if (this.currentStep > 0) {
-            this.currentStep--;
-            this.updateStepDisplay();
-            if (this.stepCallback) {
-                this.stepCallback(this.steps[this.currentStep]);
-            }
+        const current = this.replayTarget !== null ? this.replayTarget : this.currentStep;
+        if (current > 0) {
+            this.seek(current - 1);
         }
     }
 
@@ -119,6 +239,147 @@ class AnimationController {
     }
 }
 
+AnimationController.FULL_SPEED_SECONDS = 20;
+
+/**
+ * Step trace decoded by trace-worker.js. Only a window of parsed batches is
+ * kept on the main thread; it exposes the part of the array interface that
+ * AnimationController uses (length, get, has) and prefetches ahead. Rewinds
+ * replay from step 0, reloading evicted batches as they go (onReceive).
+ */
+class WorkerTrace {
+    constructor(loader, id, length, batchSize) {
+        this.loader = loader;
+        this.id = id;
+        this.length = length;
+        this.batchSize = batchSize;
+        this.batches = new Map(); // batch index -> steps, least recently used first
+        this.pending = new Set();
+        this.onReceive = null;
+    }
+
+    has(index) {
+        return this.batches.has(Math.floor(index / this.batchSize));
+    }
+
+    get(index) {
+        const batchIndex = Math.floor(index / this.batchSize);
+        const batch = this.batches.get(batchIndex);
+        if (!batch) {
+            this.request(batchIndex);
+            return undefined;
+        }
+        this.batches.delete(batchIndex);
+        this.batches.set(batchIndex, batch);
+        return batch[index % this.batchSize];
+    }
+
+    prefetch(index) {
+        const first = Math.floor(index / this.batchSize);
+        for (let batchIndex = first; batchIndex < first + WorkerTrace.PREFETCH_BATCHES; batchIndex++) {
+            this.request(batchIndex);
+        }
+    }
+
+    request(batchIndex) {
+        if (batchIndex * this.batchSize >= this.length ||
+            this.batches.has(batchIndex) || this.pending.has(batchIndex)) return;
+        this.pending.add(batchIndex);
+        this.loader.requestBatch(this.id, batchIndex);
+    }
+
+    receive(batchIndex, steps) {
+        this.pending.delete(batchIndex);
+        this.batches.set(batchIndex, steps);
+        while (this.batches.size > WorkerTrace.MAX_BATCHES) {
+            this.batches.delete(this.batches.keys().next().value);
+        }
+        if (this.onReceive) this.onReceive(batchIndex);
+    }
+}
+
+WorkerTrace.BATCH_SIZE = 2000;
+WorkerTrace.PREFETCH_BATCHES = 3;
+WorkerTrace.MAX_BATCHES = 8;
+
+/**
+ * Loads step traces. Fetching and JSON decoding run in trace-worker.js and
+ * batches come back as structured-cloned step arrays; without Worker
+ * support the trace is fetched and parsed on the main thread instead.
+ */
+class TraceLoader {
+    constructor() {
+        this.worker = null;
+        this.nextId = 0;
+        this.loads = new Map();  // id -> {resolve, reject, failureMessage}
+        this.traces = new Map(); // id -> WorkerTrace
+    }
+
+    static isSupported() {
+        return typeof Worker !== 'undefined' && TRACE_WORKER_URL !== null;
+    }
+
+    // Resolves to {steps, data}: steps is an array or a WorkerTrace, data is
+    // the rest of the response payload (complexity etc.)
+    async load(url, failureMessage, init = {}) {
+        if (!TraceLoader.isSupported()) {
+            const response = await fetch(url, init);
+            if (!response.ok) throw new Error(failureMessage);
+            const data = await response.json();
+            const steps = data.steps;
+            delete data.steps;
+            return {steps, data};
+        }
+
+        if (!this.worker) {
+            this.worker = new Worker(TRACE_WORKER_URL);
+            this.worker.onmessage = (event) => this.handleMessage(event.data);
+        }
+        // Only one trace plays at a time; let the worker drop the previous one
+        for (const id of this.traces.keys()) {
+            this.worker.postMessage({type: 'release', id});
+        }
+        this.traces.clear();
+
+        const id = ++this.nextId;
+        return new Promise((resolve, reject) => {
+            this.loads.set(id, {resolve, reject, failureMessage});
+            this.worker.postMessage({
+                type: 'load',
+                id,
+                url: new URL(url, window.location.href).href,
+                init,
+                batchSize: WorkerTrace.BATCH_SIZE
+            });
+        });
+    }
+
+    requestBatch(id, batchIndex) {
+        this.worker.postMessage({type: 'batch', id, index: batchIndex});
+    }
+
+    handleMessage(message) {
+        if (message.type === 'meta') {
+            const trace = new WorkerTrace(this, message.id, message.length, message.batchSize);
+            trace.receive(0, message.steps);
+            this.traces.set(message.id, trace);
+            const load = this.loads.get(message.id);
+            this.loads.delete(message.id);
+            if (load) load.resolve({steps: trace, data: message.data});
+        } else if (message.type === 'batch') {
+            const trace = this.traces.get(message.id);
+            if (trace) trace.receive(message.index, message.steps);
+        } else if (message.type === 'batch_error') {
+            // The batch stays pending so playback stalls instead of retrying every frame
+            Utils.showError(message.message);
+        } else if (message.type === 'error') {
+            const load = this.loads.get(message.id);
+            this.loads.delete(message.id);
+            if (load) load.reject(new Error(message.message || load.failureMessage));
+        }
+    }
+}
+
 /**
  * Canvas utility functions
  */
@@ -270,6 +531,51 @@ function partition(arr, low, high):
     swap(arr[i+1], arr[high])
     return i + 1`,
 
+    heapSort: `// Heap Sort Algorithm
+function heapSort(arr):
+    build_max_heap(arr)
+    for end = n-1 down to 1:
+        swap(arr[0], arr[end])
+        siftDown(arr, 0, end)
+    return arr
+
+function siftDown(arr, root, end):
+    while child of root < end:
+        if arr[right] > arr[left]: child = right
+        if arr[child] > arr[root]:
+            swap(arr[root], arr[child])`,
+
+    shellSort: `// Shell Sort Algorithm
+function shellSort(arr):
+    for gap in gaps (largest first):
+        for i = gap to n-1:
+            key = arr[i]
+            j = i
+            while j >= gap and arr[j-gap] > key:
+                arr[j] = arr[j-gap]
+                j = j - gap
+            arr[j] = key
+    return arr`,
+
+    countingSort: `// Counting Sort Algorithm
+function countingSort(arr):
+    count = zeros(max - min + 1)
+    for value in arr:
+        count[value] += 1
+    k = 0
+    for value, c in count:
+        repeat c times: arr[k] = value; k++
+    return arr`,
+
+    radixSort: `// Radix Sort (LSD)
+function radixSort(arr):
+    for each digit (least significant first):
+        buckets = [[] x 10]
+        for value in arr:
+            bucket[digit(value)].append(value)
+        arr = concatenate(buckets)
+    return arr`,
+
     inorderTraversal: `// Inorder Traversal
 function inorder(node):
     if node is not null:
@@ -510,6 +816,8 @@ document.addEventListener('DOMContentLoaded', function() {
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
         AnimationController,
+        WorkerTrace,
+        TraceLoader,
         CanvasUtils,
         ColorScheme,
         PseudocodeTemplates,
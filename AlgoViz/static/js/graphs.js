@@ -1,17 +1,29 @@
 // Graph traversal visualization
+
+// Graphs at least this large are laid out by the server (layout=1)
+const SERVER_LAYOUT_MIN_NODES = 6;
+// Random graphs get 4-12 nodes unless a larger count was entered
+const RANDOM_GRAPH_MAX_NODES = 12;
+
 class GraphVisualizer {
     constructor() {
         this.canvas = document.getElementById('graphCanvas');
         this.ctx = this.canvas.getContext('2d');
         this.animationController = new AnimationController();
+        this.traceLoader = new TraceLoader();
         this.graph = {};
         this.steps = [];
         this.currentAlgorithm = 'bfs';
         this.nodePositions = [];
+        this.layout = null; // server positions in [0, 1]
+        this.nodeRadius = 20;
         this.edges = [];
         this.nodeCount = 5;
         this.startNode = 0;
         this.traversalOrder = [];
+        this.frontier = [];
+        this.frontierNodes = new Map(); // node -> occurrences (DFS may push twice)
+        this.visitedNodes = new Set();
         
         this.setupCanvas();
         this.setupEventListeners();
@@ -85,15 +97,55 @@ class GraphVisualizer {
     }
 
     setupAnimationController() {
+        this.animationController.setApplyCallback((step) => {
+            this.trackState(step);
+        });
         this.animationController.setStepCallback((step) => {
             this.drawGraph(step);
             this.updateCurrentAction(step);
             this.updateDataStructure(step);
-            this.updateTraversalOrder(step);
+            this.updateTraversalOrderDisplay();
             this.highlightPseudocode(step);
         });
     }
 
+    trackState(step) {
+        if (!step || step.type === 'initialize') {
+            this.frontier = [];
+            this.frontierNodes = new Map();
+            this.visitedNodes = new Set();
+            if (!step) {
+                this.traversalOrder = [];
+                return;
+            }
+        }
+
+        // Steps only carry the node that entered or left each structure
+        const removed = step.dequeued !== undefined ? step.dequeued : step.popped;
+        if (removed !== undefined) {
+            if (step.dequeued !== undefined) {
+                this.frontier.shift();
+            } else {
+                this.frontier.pop();
+            }
+            const count = this.frontierNodes.get(removed) - 1;
+            if (count > 0) {
+                this.frontierNodes.set(removed, count);
+            } else {
+                this.frontierNodes.delete(removed);
+            }
+        }
+        const added = step.enqueued !== undefined ? step.enqueued : step.pushed;
+        if (added !== undefined) {
+            this.frontier.push(added);
+            this.frontierNodes.set(added, (this.frontierNodes.get(added) || 0) + 1);
+        }
+        if (step.visited_node !== undefined && !this.visitedNodes.has(step.visited_node)) {
+            this.visitedNodes.add(step.visited_node);
+            this.traversalOrder.push(step.visited_node);
+        }
+    }
+
     loadInitialGraph() {
         this.buildGraphFromInput();
         this.updateDataStructureTitle();
@@ -122,6 +174,7 @@ class GraphVisualizer {
             }
             
             this.buildGraph();
+            this.layout = null;
             this.calculateNodePositions();
             this.drawGraph();
             this.traversalOrder = [];
@@ -154,8 +207,19 @@ class GraphVisualizer {
         const radius = Math.min(centerX, centerY) - 50;
         
         this.nodePositions = [];
+        this.nodeRadius = 20;
         
-        if (this.nodeCount <= 4) {
+        if (this.layout && this.layout.length === this.nodeCount) {
+            // Scale the server layout to the canvas, shrinking nodes to fit
+            const margin = 40;
+            const width = this.canvas.width - 2 * margin;
+            const height = this.canvas.height - 2 * margin;
+            this.nodeRadius = Math.max(3, Math.min(20, 0.3 * Math.sqrt(width * height / this.nodeCount)));
+            this.nodePositions = this.layout.map(([x, y]) => ({
+                x: margin + x * width,
+                y: margin + y * height
+            }));
+        } else if (this.nodeCount <= 4) {
             // Special layouts for small graphs
             switch (this.nodeCount) {
                 case 3:
@@ -175,7 +239,8 @@ class GraphVisualizer {
                     break;
             }
         } else {
-            // Circular layout for larger graphs
+            // Circular layout for larger graphs, shrinking nodes to fit
+            this.nodeRadius = Math.max(3, Math.min(20, 0.8 * Math.PI * radius / this.nodeCount));
             for (let i = 0; i < this.nodeCount; i++) {
                 const angle = (2 * Math.PI * i) / this.nodeCount - Math.PI / 2; // Start from top
                 this.nodePositions.push({
@@ -187,7 +252,9 @@ class GraphVisualizer {
     }
 
     generateRandomGraph() {
-        this.nodeCount = Math.floor(Math.random() * 4) + 4; // 4-7 nodes
+        const requested = parseInt(document.getElementById('nodesInput').value) || 0;
+        this.nodeCount = requested > RANDOM_GRAPH_MAX_NODES ? requested :
+            Math.floor(Math.random() * (RANDOM_GRAPH_MAX_NODES - 3)) + 4;
         document.getElementById('nodesInput').value = this.nodeCount;
         
         const edges = Utils.generateRandomGraph(this.nodeCount);
@@ -215,13 +282,19 @@ class GraphVisualizer {
             Utils.showInfo('Loading traversal steps...');
 
             const edgesParam = this.edges.map(([u, v]) => `${u}-${v}`).join(',');
-            const url = `/api/graph/${this.currentAlgorithm}?edges=${encodeURIComponent(edgesParam)}&nodes=${this.nodeCount}&start=${this.startNode}`;
+            const scope = document.getElementById('allComponentsInput').checked ? 'all' : 'start';
+            let url = `/api/graph/${this.currentAlgorithm}?edges=${encodeURIComponent(edgesParam)}&nodes=${this.nodeCount}&start=${this.startNode}&scope=${scope}`;
+            if (this.nodeCount >= SERVER_LAYOUT_MIN_NODES) {
+                url += '&layout=1';
+            }
             
-            const response = await fetch(url);
-            if (!response.ok) throw new Error('Failed to fetch traversal steps');
-
-            const data = await response.json();
-            this.steps = data.steps;
+            // Large traces are fetched and decoded by the trace worker
+            const {steps, data} = await this.traceLoader.load(url, 'Failed to fetch traversal steps');
+            if (data && data.layout) {
+                this.layout = data.layout;
+                this.calculateNodePositions();
+            }
+            this.steps = steps;
             this.animationController.setSteps(this.steps);
             this.traversalOrder = [];
             
@@ -294,17 +367,34 @@ class GraphVisualizer {
         const ctx = this.ctx;
         const width = this.canvas.width;
         const height = this.canvas.height;
+        const current = step ? step.current : undefined;
         
-        CanvasUtils.clearCanvas(ctx, width, height);
-
-        // Draw edges first
-        this.drawEdges(ctx, step);
+        // Edge highlighting only depends on the current node, so while it is
+        // unchanged just the nodes whose colors changed are repainted
+        const cache = this.nodeCache;
+        const fullRedraw = !cache || !step || step.type === 'initialize' ||
+            cache.width !== width || cache.height !== height ||
+            cache.positions !== this.nodePositions || cache.current !== current;
+        
+        if (fullRedraw) {
+            CanvasUtils.clearCanvas(ctx, width, height);
+            this.nodeCache = {
+                width, height, current,
+                positions: this.nodePositions,
+                colors: new Array(this.nodeCount)
+            };
+
+            // Draw edges first
+            this.drawEdges(ctx, step);
+        }
         
         // Draw nodes
-        this.drawNodes(ctx, step);
+        this.drawNodes(ctx, step, this.nodeCache.colors);
         
         // Draw labels
-        this.drawLabels(ctx);
+        if (fullRedraw) {
+            this.drawLabels(ctx);
+        }
     }
 
     drawEdges(ctx, step) {
@@ -331,8 +421,8 @@ class GraphVisualizer {
         }
     }
 
-    drawNodes(ctx, step) {
-        const nodeRadius = 20;
+    drawNodes(ctx, step, drawnColors) {
+        const nodeRadius = this.nodeRadius;
         
         for (let i = 0; i < this.nodeCount; i++) {
             const pos = this.nodePositions[i];
@@ -342,16 +432,13 @@ class GraphVisualizer {
             let borderColor = ColorScheme.treeNodeBorder;
             
             if (step) {
-                if (step.visited && step.visited.includes(i)) {
+                if (this.visitedNodes.has(i)) {
                     nodeColor = ColorScheme.visited;
                     borderColor = ColorScheme.success;
                 } else if (step.current === i) {
                     nodeColor = ColorScheme.currentNode;
                     borderColor = ColorScheme.primary;
-                } else if (step.queue && step.queue.includes(i)) {
-                    nodeColor = ColorScheme.inQueue;
-                    borderColor = ColorScheme.warning;
-                } else if (step.stack && step.stack.includes(i)) {
+                } else if (this.frontierNodes.has(i)) {
                     nodeColor = ColorScheme.inQueue;
                     borderColor = ColorScheme.warning;
                 }
@@ -363,8 +450,15 @@ class GraphVisualizer {
                 borderColor = ColorScheme.primary;
             }
             
+            // A node keeps its own fill and border, so repainting it in place
+            // fully covers the previous frame
+            if (drawnColors[i] === nodeColor) continue;
+            drawnColors[i] = nodeColor;
+            
             CanvasUtils.drawCircle(ctx, pos.x, pos.y, nodeRadius, nodeColor, borderColor);
-            CanvasUtils.drawText(ctx, i.toString(), pos.x, pos.y + 5, ColorScheme.text, '14px Arial');
+            if (nodeRadius >= 12) {
+                CanvasUtils.drawText(ctx, i.toString(), pos.x, pos.y + 5, ColorScheme.text, '14px Arial');
+            }
         }
     }
 
@@ -373,7 +467,7 @@ class GraphVisualizer {
         if (this.startNode < this.nodePositions.length) {
             const pos = this.nodePositions[this.startNode];
             if (pos) {
-                CanvasUtils.drawText(ctx, 'START', pos.x, pos.y - 35, ColorScheme.primary, '10px Arial');
+                CanvasUtils.drawText(ctx, 'START', pos.x, pos.y - this.nodeRadius - 15, ColorScheme.primary, '10px Arial');
             }
         }
     }
@@ -400,7 +494,7 @@ class GraphVisualizer {
         }
 
         const isQueue = this.currentAlgorithm === 'bfs';
-        const structure = isQueue ? (step.queue || []) : (step.stack || []);
+        const structure = this.frontier;
         
         if (structure.length === 0) {
             dataStructureElement.innerHTML = `<div class="text-muted">Empty ${isQueue ? 'queue' : 'stack'}</div>`;
@@ -419,21 +513,16 @@ class GraphVisualizer {
         }
     }
 
-    updateTraversalOrder(step) {
-        if (!step) return;
-
-        if (step.type === 'visit' && step.current !== undefined) {
-            if (!this.traversalOrder.includes(step.current)) {
-                this.traversalOrder.push(step.current);
-                this.updateTraversalOrderDisplay();
-            }
-        }
-    }
-
     updateTraversalOrderDisplay() {
         const orderElement = document.getElementById('traversalOrder');
         if (!orderElement) return;
 
+        // Rewriting a long order string every frame is the slow part; skip
+        // it when nothing new was visited
+        const shown = this.shownTraversalOrder;
+        if (shown && shown.order === this.traversalOrder && shown.length === this.traversalOrder.length) return;
+        this.shownTraversalOrder = {order: this.traversalOrder, length: this.traversalOrder.length};
+
         if (this.traversalOrder.length === 0) {
             orderElement.textContent = 'Build a graph and start traversal to see the order';
         } else {
@@ -4,6 +4,7 @@ class SortingVisualizer {
         this.canvas = document.getElementById('sortingCanvas');
         this.ctx = this.canvas.getContext('2d');
         this.animationController = new AnimationController();
+        this.traceLoader = new TraceLoader();
         this.array = [];
         this.steps = [];
         this.currentAlgorithm = 'bubble';
@@ -30,6 +31,7 @@ class SortingVisualizer {
         // Algorithm selection
         document.getElementById('algorithmSelect').addEventListener('change', (e) => {
             this.currentAlgorithm = e.target.value;
+            this.updateAlgorithmOptions();
             this.updatePseudocode();
             this.updateComplexityInfo();
             this.reset();
@@ -68,6 +70,31 @@ class SortingVisualizer {
         });
     }
 
+    updateAlgorithmOptions() {
+        document.getElementById('mergeOptions').classList.toggle('d-none', this.currentAlgorithm !== 'merge');
+        document.getElementById('shellOptions').classList.toggle('d-none', this.currentAlgorithm !== 'shell');
+        document.getElementById('quickOptions').classList.toggle('d-none', this.currentAlgorithm !== 'quick');
+    }
+
+    getAlgorithmParams() {
+        const params = new URLSearchParams({ data: this.array.join(',') });
+        const detail = document.getElementById('detailSelect').value;
+        if (detail !== 'full') {
+            params.set('detail', detail);
+        }
+        if (this.currentAlgorithm === 'merge') {
+            params.set('variant', document.getElementById('mergeVariantSelect').value);
+        }
+        if (this.currentAlgorithm === 'shell') {
+            params.set('gaps', document.getElementById('gapsSelect').value);
+        }
+        if (this.currentAlgorithm === 'quick') {
+            params.set('pivot', document.getElementById('pivotSelect').value);
+            params.set('partition', document.getElementById('partitionSelect').value);
+        }
+        return params.toString();
+    }
+
     setupAnimationController() {
         this.animationController.setStepCallback((step) => {
             this.draw(step);
@@ -120,11 +147,9 @@ class SortingVisualizer {
             this.setControlsState('loading');
             Utils.showInfo('Loading algorithm steps...');
 
-            const response = await fetch(`/api/sort/${this.currentAlgorithm}?data=${this.array.join(',')}`);
-            if (!response.ok) throw new Error('Failed to fetch algorithm steps');
-
-            const data = await response.json();
-            this.steps = data.steps;
+            // Large traces are fetched and decoded by the trace worker
+            const {steps} = await this.traceLoader.load(`/api/sort/${this.currentAlgorithm}?${this.getAlgorithmParams()}`, 'Failed to fetch algorithm steps');
+            this.steps = steps;
             this.animationController.setSteps(this.steps);
             
             this.setControlsState('playing');
@@ -196,71 +221,111 @@ class SortingVisualizer {
         const width = this.canvas.width;
         const height = this.canvas.height;
         
-        // Clear canvas
-        CanvasUtils.clearCanvas(ctx, width, height);
-        
-        // Calculate bar dimensions
-        const padding = 20;
-        const barWidth = (width - padding * 2) / this.array.length;
-        const maxValue = Math.max(...this.array);
-        const barHeightScale = (height - padding * 2) / maxValue;
-
         // Get current array state
         let currentArray = this.array;
         if (step && step.array) {
             currentArray = step.array;
         }
 
+        // Calculate bar dimensions
+        const padding = 20;
+        const barWidth = (width - padding * 2) / this.array.length;
+        const barGap = barWidth >= 8 ? 2 : 0;
+        const showValues = barWidth >= 24;
+        const barHeightScale = (height - padding * 2) / this.getMaxValue();
+        const mergeInfo = Boolean(step && step.type === 'merge_start');
+
+        // Only bars whose value or color changed since the last frame are
+        // repainted; layout changes and the merge info overlay force a full redraw
+        let cache = this.barCache;
+        const fullRedraw = !cache || !step || cache.mergeInfo || mergeInfo ||
+            cache.width !== width || cache.height !== height || cache.length !== currentArray.length;
+        if (fullRedraw) {
+            CanvasUtils.clearCanvas(ctx, width, height);
+            cache = this.barCache = {
+                width, height, length: currentArray.length,
+                values: new Array(currentArray.length),
+                colors: new Array(currentArray.length)
+            };
+        }
+        cache.mergeInfo = mergeInfo;
+
         // Draw bars
         currentArray.forEach((value, index) => {
+            const color = this.getBarColor(step, index);
+            if (cache.values[index] === value && cache.colors[index] === color) return;
+            cache.values[index] = value;
+            cache.colors[index] = color;
+
             const x = padding + index * barWidth;
             const barHeight = value * barHeightScale;
             const y = height - padding - barHeight;
             
-            // Determine bar color based on step
-            let color = ColorScheme.default;
-            if (step) {
-                if (step.comparing && step.comparing.includes(index)) {
-                    color = ColorScheme.comparing;
-                } else if (step.swapped && step.swapped.includes(index)) {
-                    color = ColorScheme.swapping;
-                } else if (step.type === 'complete') {
-                    color = ColorScheme.sorted;
-                } else if (step.current_min === index) {
-                    color = ColorScheme.current;
-                } else if (step.key_index === index) {
-                    color = ColorScheme.current;
-                } else if (step.pivot_index === index) {
-                    color = ColorScheme.warning;
-                } else if (step.merged_index === index) {
-                    color = ColorScheme.success;
-                }
+            if (!fullRedraw) {
+                const left = Math.floor(x);
+                ctx.clearRect(left, 0, Math.ceil(x + barWidth) - left, height);
             }
             
             // Draw bar
-            CanvasUtils.drawRect(ctx, x + 2, y, barWidth - 4, barHeight, color);
+            CanvasUtils.drawRect(ctx, x + barGap, y, barWidth - barGap * 2, barHeight, color);
             
             // Draw value text
-            CanvasUtils.drawText(
-                ctx, 
-                value.toString(), 
-                x + barWidth / 2, 
-                y - 5, 
-                ColorScheme.text, 
-                '12px Arial'
-            );
+            if (showValues) {
+                CanvasUtils.drawText(
+                    ctx, 
+                    value.toString(), 
+                    x + barWidth / 2, 
+                    y - 5, 
+                    ColorScheme.text, 
+                    '12px Arial'
+                );
+            }
         });
 
         // Draw additional information for specific algorithms
-        if (step && step.type === 'merge_start' && step.left_subarray && step.right_subarray) {
+        if (mergeInfo) {
             this.drawMergeInfo(ctx, step, width, height);
         }
     }
 
+    getMaxValue() {
+        // Spreading a 10^5-element array into Math.max overflows the stack
+        if (this.maxValueArray !== this.array) {
+            this.maxValue = this.array.reduce((max, value) => Math.max(max, value), -Infinity);
+            this.maxValueArray = this.array;
+        }
+        return this.maxValue;
+    }
+
+    getBarColor(step, index) {
+        if (!step) return ColorScheme.default;
+        if (step.comparing && step.comparing.includes(index)) {
+            return ColorScheme.comparing;
+        } else if (step.swapped && step.swapped.includes(index)) {
+            return ColorScheme.swapping;
+        } else if (step.type === 'complete') {
+            return ColorScheme.sorted;
+        } else if (step.current_min === index) {
+            return ColorScheme.current;
+        } else if (step.key_index === index) {
+            return ColorScheme.current;
+        } else if (step.pivot_index === index) {
+            return ColorScheme.warning;
+        } else if (step.merged_index === index || step.written === index) {
+            return ColorScheme.success;
+        } else if (step.sorted_from !== undefined && index >= step.sorted_from) {
+            return ColorScheme.sorted;
+        }
+        return ColorScheme.default;
+    }
+
     drawMergeInfo(ctx, step, width, height) {
         const infoY = height - 60;
-        const leftInfo = `Left: [${step.left_subarray.join(', ')}]`;
-        const rightInfo = `Right: [${step.right_subarray.join(', ')}]`;
+        // Bottom-up steps only carry bounds; slice the pre-merge array instead
+        const leftArr = step.left_subarray || step.array.slice(step.left, step.mid + 1);
+        const rightArr = step.right_subarray || step.array.slice(step.mid + 1, step.right + 1);
+        const leftInfo = `Left: [${leftArr.join(', ')}]`;
+        const rightInfo = `Right: [${rightArr.join(', ')}]`;
         
         CanvasUtils.drawText(ctx, leftInfo, 20, infoY, ColorScheme.info, '12px Arial', 'left');
         CanvasUtils.drawText(ctx, rightInfo, 20, infoY + 20, ColorScheme.warning, '12px Arial', 'left');
@@ -330,7 +395,11 @@ class SortingVisualizer {
             selection: { time_best: 'O(n²)', time_avg: 'O(n²)', time_worst: 'O(n²)', space: 'O(1)' },
             insertion: { time_best: 'O(n)', time_avg: 'O(n²)', time_worst: 'O(n²)', space: 'O(1)' },
             merge: { time_best: 'O(n log n)', time_avg: 'O(n log n)', time_worst: 'O(n log n)', space: 'O(n)' },
-            quick: { time_best: 'O(n log n)', time_avg: 'O(n log n)', time_worst: 'O(n²)', space: 'O(log n)' }
+            quick: { time_best: 'O(n log n)', time_avg: 'O(n log n)', time_worst: 'O(n²)', space: 'O(log n)' },
+            heap: { time_best: 'O(n log n)', time_avg: 'O(n log n)', time_worst: 'O(n log n)', space: 'O(1)' },
+            shell: { time_best: 'O(n log n)', time_avg: 'O(n^1.25)', time_worst: 'O(n^1.5)', space: 'O(1)' },
+            counting: { time_best: 'O(n + k)', time_avg: 'O(n + k)', time_worst: 'O(n + k)', space: 'O(n + k)' },
+            radix: { time_best: 'O(d·(n + b))', time_avg: 'O(d·(n + b))', time_worst: 'O(d·(n + b))', space: 'O(n + b)' }
         };
 
         const complexity = complexities[this.currentAlgorithm];
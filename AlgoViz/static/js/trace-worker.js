@@ -0,0 +1,90 @@
+// Fetches and decodes step traces off the main thread (see TraceLoader in common.js)
+const traces = new Map(); // id -> {steps, batchSize} or {traceUrl, batchSize} once spilled
+
+// Decoders by response content type; each returns {steps, data}
+const decoders = {
+    'application/json': async (response) => {
+        const data = await response.json();
+        const steps = data.steps || [];
+        delete data.steps;
+        return {steps, data};
+    }
+};
+
+// Batches are posted as parsed step objects; structured cloning them is
+// cheaper for the page than parsing JSON text again. Steps are heterogeneous
+// objects with no fixed binary layout, so they are cloned rather than
+// transferred as ArrayBuffers.
+async function loadBatch(trace, index) {
+    const start = index * trace.batchSize;
+    if (trace.traceUrl) {
+        // Spilled traces stay on the server and are paged in by slice
+        const response = await fetch(`${trace.traceUrl}?start=${start}&count=${trace.batchSize}`);
+        if (!response.ok) throw new Error('Trace expired on the server');
+        return response.json();
+    }
+    return trace.steps.slice(start, start + trace.batchSize);
+}
+
+async function load(message) {
+    // Large traces are spilled to disk server-side and paged in by slice
+    const url = new URL(message.url);
+    url.searchParams.set('spill', '1');
+    const response = await fetch(url, message.init);
+    if (!response.ok) {
+        // Leave the message to the page unless the API explained the failure
+        let error = null;
+        try {
+            error = (await response.json()).error || null;
+        } catch (ignored) {}
+        self.postMessage({type: 'error', id: message.id, message: error});
+        return;
+    }
+
+    const contentType = (response.headers.get('Content-Type') || '').split(';')[0].trim();
+    const decode = decoders[contentType];
+    if (!decode) {
+        self.postMessage({type: 'error', id: message.id, message: `Unsupported trace format: ${contentType}`});
+        return;
+    }
+
+    const {steps, data} = await decode(response);
+    const trace = {steps, batchSize: message.batchSize};
+    let length = steps.length;
+    if (data.trace_id) {
+        trace.traceUrl = new URL(`/api/trace/${data.trace_id}`, url).href;
+        length = data.total;
+        delete data.trace_id;
+        delete data.total;
+    }
+    traces.set(message.id, trace);
+
+    const firstBatch = await loadBatch(trace, 0);
+    self.postMessage({
+        type: 'meta',
+        id: message.id,
+        length,
+        batchSize: trace.batchSize,
+        data,
+        steps: firstBatch
+    });
+}
+
+self.onmessage = (event) => {
+    const message = event.data;
+    if (message.type === 'load') {
+        load(message).catch((error) => {
+            self.postMessage({type: 'error', id: message.id, message: error.message});
+        });
+    } else if (message.type === 'batch') {
+        const trace = traces.get(message.id);
+        if (!trace) return;
+        loadBatch(trace, message.index).then((steps) => {
+            self.postMessage({type: 'batch', id: message.id, index: message.index, steps});
+        }, (error) => {
+            self.postMessage({type: 'batch_error', id: message.id, index: message.index, message: error.message});
+        });
+    } else if (message.type === 'release') {
+        traces.delete(message.id);
+    }
+};
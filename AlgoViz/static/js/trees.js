@@ -74,11 +74,14 @@ class TreeVisualizer {
     }
 
     setupAnimationController() {
+        this.animationController.setApplyCallback((step) => {
+            this.updateTraversalResult(step);
+        });
         this.animationController.setStepCallback((step) => {
             this.drawTree(step);
             this.updateCurrentAction(step);
             this.updateCallStack(step);
-            this.updateTraversalResult(step);
+            this.updateTraversalResultDisplay();
             this.highlightPseudocode(step);
         });
     }
@@ -384,11 +387,13 @@ class TreeVisualizer {
     }
 
     updateTraversalResult(step) {
-        if (!step) return;
+        if (!step) {
+            this.traversalResult = [];
+            return;
+        }
 
         if (step.type === 'process') {
             this.traversalResult.push(step.node);
-            this.updateTraversalResultDisplay();
         }
     }
 
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('WARM_CACHE', '0')
+os.environ.setdefault('RATE_LIMIT_PER_SECOND', '0')  # tests share one client address
+os.environ.setdefault('TRACE_STORE_DIR', tempfile.mkdtemp(prefix='algoviz-test-traces-'))
+
+@pytest.fixture
+def client():
+    from app import app
+    return app.test_client()
@@ -0,0 +1,51 @@
+import pytest
+
+@pytest.fixture
+def limits(client):
+    from app import app
+    saved = {name: app.config[name] for name in
+             ('ADMISSION_STEP_UNIT', 'RATE_LIMIT_PER_SECOND', 'RATE_LIMIT_BURST', 'MAX_CONCURRENT_COST')}
+    app.config.update(ADMISSION_STEP_UNIT=10, RATE_LIMIT_PER_SECOND=0.01,
+                      RATE_LIMIT_BURST=30, MAX_CONCURRENT_COST=100)
+    yield app.config
+    app.config.update(saved)
+
+def test_requests_heavier_than_the_burst_are_rejected(client, limits):
+    # 2^10 events weigh 102 > burst
+    assert client.get('/api/recursion/tower?n=10&format=events').status_code == 413
+
+def test_sequential_requests_are_rate_limited(client, limits):
+    headers = {'X-Forwarded-For': '203.0.113.7'}
+    # 2^8 events weigh 25 of the 30 tokens, 2^7 another 12
+    assert client.get('/api/recursion/tower?n=8&format=events', headers=headers).status_code == 200
+    response = client.get('/api/recursion/tower?n=7&format=events', headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    # Other clients have their own bucket
+    assert client.get('/api/recursion/tower?n=7&format=events').status_code == 200
+
+def test_light_requests_are_exempt(client, limits):
+    headers = {'X-Forwarded-For': '203.0.113.8'}
+    for n in range(1, 4):
+        assert client.get(f'/api/recursion/tower?n={n}&format=events', headers=headers).status_code == 200
+
+def test_deep_stack_traces_are_priced_by_frames(client, limits):
+    # Standard steps copy the call stack: 8 · 2^10 frames weigh 819
+    assert client.get('/api/recursion/tower?n=8').status_code == 413
+
+@pytest.mark.parametrize('url', [
+    '/api/recursion/fibonacci?n=1000',
+    '/api/recursion/tower?n=16',
+    '/api/recursion/tower?n=20',
+])
+def test_default_limits_reject_huge_traces(client, url):
+    from app import app
+    saved = app.config['RATE_LIMIT_PER_SECOND']
+    app.config['RATE_LIMIT_PER_SECOND'] = 10
+    try:
+        assert client.get(url).status_code == 413
+    finally:
+        app.config['RATE_LIMIT_PER_SECOND'] = saved
+
+def test_tower_height_is_capped(client):
+    assert client.get('/api/recursion/tower?n=13&format=events').status_code == 400
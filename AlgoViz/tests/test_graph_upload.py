@@ -0,0 +1,40 @@
+import pytest
+
+@pytest.mark.parametrize('edges', [
+    [[0, 1.7]],
+    [[0, 1, 2], [1, 2, 0]],
+    [[0, 1], [2]],
+    [0, 1, 2],
+    [['0', '1']],
+])
+def test_malformed_edges_are_rejected(client, edges):
+    response = client.post('/api/graph/bfs', json={'nodes': 3, 'edges': edges})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('edges', [[[0, 1], [1, 2]], [0, 1, 1, 2], []])
+def test_edge_formats(client, edges):
+    response = client.post('/api/graph/bfs', json={'nodes': 3, 'edges': edges})
+    assert response.status_code == 200
+
+def test_node_count_is_limited(client):
+    from app import app
+    too_many = app.config['MAX_GRAPH_NODES'] + 1
+    assert client.post('/api/graph/bfs', json={'nodes': too_many, 'edges': []}).status_code == 400
+    assert client.post(f'/api/graph/bfs?nodes={too_many}', data=b'',
+                       content_type='application/octet-stream').status_code == 400
+    assert client.get(f'/api/graph/bfs?nodes={too_many}').status_code == 400
+    assert client.get(f'/api/graph/bfs?nodes=3&edges=0-{too_many}').status_code == 400
+
+@pytest.mark.parametrize('weight', ['nan', 'inf', '-1'])
+def test_query_weights_must_be_finite(client, weight):
+    response = client.get(f'/api/graph/dijkstra?nodes=3&edges=0-1:{weight},1-2:1')
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('edges', ['0-1:abc', '0-x', '0-1-2'])
+def test_malformed_query_edges_are_rejected(client, edges):
+    assert client.get(f'/api/graph/dijkstra?nodes=3&edges={edges}').status_code == 400
+
+@pytest.mark.parametrize('target', [3, -1])
+def test_query_target_must_be_a_node(client, target):
+    response = client.get(f'/api/graph/astar?nodes=3&edges=0-1,1-2&target={target}')
+    assert response.status_code == 400
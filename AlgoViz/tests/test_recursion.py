@@ -0,0 +1,80 @@
+import pytest
+
+from algorithms import (LONG_INPUT_THRESHOLD, MAX_TRACED_DEPTH, factorial_trace, fibonacci_call_tree,
+                        fibonacci_steps, reverse_string_trace)
+
+def test_traces_are_not_limited_by_the_recursion_limit():
+    assert len(factorial_trace(MAX_TRACED_DEPTH).frame_args) == MAX_TRACED_DEPTH
+    assert len(reverse_string_trace('x' * MAX_TRACED_DEPTH).frame_args) == MAX_TRACED_DEPTH
+    assert fibonacci_steps(MAX_TRACED_DEPTH)[-1]['type'] == 'return'
+
+def test_largest_accepted_fibonacci(client):
+    response = client.get(f'/api/recursion/fibonacci?n={MAX_TRACED_DEPTH}')
+    assert response.status_code == 200
+    assert response.get_json()['steps'][0]['n'] == MAX_TRACED_DEPTH
+    response = client.get(f'/api/recursion/fibonacci?n={MAX_TRACED_DEPTH}&format=events')
+    assert response.status_code == 200
+
+def test_inputs_above_the_traced_depth_are_rejected(client):
+    response = client.get(f'/api/recursion/fibonacci?n={MAX_TRACED_DEPTH + 1}')
+    assert response.status_code == 400
+
+def test_auto_mode_switches_to_the_long_trace(client):
+    for n in (LONG_INPUT_THRESHOLD, LONG_INPUT_THRESHOLD + 1, 2000):
+        response = client.get(f'/api/recursion/factorial?n={n}')
+        assert response.status_code == 200
+        assert ('call_stack' in response.get_json()['steps'][0]) == (n <= LONG_INPUT_THRESHOLD)
+
+def test_long_events(client):
+    response = client.get('/api/recursion/factorial?n=2000&format=events')
+    assert response.status_code == 200
+    assert len(response.get_json()['trace']['frames']) == 2000
+    response = client.get(f'/api/recursion/reverse?text={"x" * 2000}&format=events')
+    assert response.status_code == 200
+
+def test_standard_mode_limits(client):
+    assert client.get(f'/api/recursion/reverse?text={"x" * LONG_INPUT_THRESHOLD}&mode=standard').status_code == 200
+    assert client.get(f'/api/recursion/reverse?text={"x" * (LONG_INPUT_THRESHOLD + 1)}&mode=standard').status_code == 400
+
+def test_unknown_mode_is_rejected(client):
+    assert client.get('/api/recursion/factorial?n=5&mode=fast').status_code == 400
+
+def test_tower_needs_at_least_one_disk(client):
+    for n in (0, -3):
+        assert client.get(f'/api/recursion/tower?n={n}').status_code == 400
+    assert client.get('/api/recursion/tower?n=1').status_code == 200
+
+def test_tower_trace_terminates_below_one_disk():
+    from algorithms import tower_of_hanoi_trace
+    assert len(tower_of_hanoi_trace(0).frame_args) == 1
+
+def test_long_mode_input_is_capped(client):
+    assert client.get('/api/recursion/factorial?n=20000&mode=long&format=events').status_code == 200
+    assert client.get('/api/recursion/factorial?n=2000000&mode=long').status_code == 400
+    assert client.get('/api/recursion/reverse?text=' + 'a' * 20001).status_code == 400
+
+@pytest.mark.parametrize('strategy', ['naive', 'memo', 'bottomup'])
+@pytest.mark.parametrize('n', [0, 1, 2, 10])
+def test_fibonacci_call_tree_counts(strategy, n):
+    tree = fibonacci_call_tree(n, strategy)
+    assert not tree['truncated']
+    assert tree['calls'] == len(tree['nodes']) == tree['call_counts'][strategy]
+    root = tree['nodes'][-1] if strategy == 'bottomup' else tree['nodes'][0]
+    assert root[2] == [0, 1, 1, 55][[0, 1, 2, 10].index(n)]
+
+def test_fibonacci_memo_tree_hits_the_memo():
+    nodes = fibonacci_call_tree(10, 'memo')['nodes']
+    assert sum(memo_hit for *_, memo_hit in nodes) == 8
+
+def test_naive_fibonacci_tree_is_truncated():
+    tree = fibonacci_call_tree(25, 'naive', max_calls=1000)
+    assert tree['truncated']
+    assert tree['calls'] == 1000
+    assert tree['nodes'][0][2] is None
+    assert tree['call_counts']['naive'] == 242785
+
+def test_fibonacci_tree_route(client):
+    response = client.get('/api/recursion/fibonacci?n=10&strategy=naive&max_calls=50')
+    assert response.status_code == 200
+    assert response.get_json()['tree']['truncated']
+    assert client.get('/api/recursion/fibonacci?n=10&strategy=greedy').status_code == 400
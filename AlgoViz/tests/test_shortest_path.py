@@ -0,0 +1,26 @@
+import pytest
+
+from algorithms import astar_steps, build_graph, dijkstra_steps
+
+# 0 -4- 1, 0 -1- 2, 1 -2- 2, 1 -5- 3, 2 -8- 3, 3 -3- 4
+WEIGHTED_EDGES = [(0, 1), (0, 2), (1, 2), (1, 3), (2, 3), (3, 4)]
+WEIGHTS = [4, 1, 2, 5, 8, 3]
+
+@pytest.mark.parametrize('frontier', ['heap', 'scan'])
+def test_dijkstra_distances(frontier):
+    steps = dijkstra_steps(build_graph(5, WEIGHTED_EDGES, WEIGHTS), 0, frontier=frontier)
+    settled = {step['visited_node']: step['distance'] for step in steps if step['type'] == 'pop'}
+    assert settled == {0: 0, 2: 1, 1: 3, 3: 8, 4: 11}
+
+def test_astar_finds_the_shortest_path():
+    graph = build_graph(5, WEIGHTED_EDGES, WEIGHTS)
+    complete = astar_steps(graph, 0, 4)[-1]
+    assert complete['path'] == [0, 2, 1, 3, 4]
+    assert complete['distance'] == 11
+    assert dijkstra_steps(graph, 0, 4)[-1]['path'] == complete['path']
+
+def test_weighted_query_route(client):
+    edges = ','.join(f'{u}-{v}:{w}' for (u, v), w in zip(WEIGHTED_EDGES, WEIGHTS))
+    response = client.get(f'/api/graph/astar?nodes=5&edges={edges}&target=4')
+    assert response.status_code == 200
+    assert response.get_json()['steps'][-1]['distance'] == 11
@@ -0,0 +1,18 @@
+import pytest
+
+@pytest.mark.parametrize('data', [
+    [3, True, 2],
+    [True, False],
+    [1.5, 2],
+    [[1, 2], [3, 4]],
+    ['1', '2'],
+    [],
+])
+def test_malformed_data_is_rejected(client, data):
+    assert client.post('/api/sort/bubble', json=data).status_code == 400
+    assert client.post('/api/sort/bubble', json={'data': data}).status_code == 400
+
+def test_uploaded_data_is_sorted(client):
+    response = client.post('/api/sort/merge', json={'data': [5, -1, 3, 3, 0]})
+    assert response.status_code == 200
+    assert response.get_json()['steps'][-1]['array'] == [-1, 0, 3, 3, 5]
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from algorithms import (QUICK_SORT_PARTITIONS, QUICK_SORT_PIVOTS, SHELL_SORT_GAPS, SORT_DETAIL_LEVELS,
+                        counting_sort_steps, heap_sort_steps, quick_sort_steps, radix_sort_steps,
+                        shell_sort_steps)
+
+def sample(n=60, seed=7):
+    rng = random.Random(seed)
+    return [rng.randint(0, 20) for _ in range(n)]
+
+@pytest.mark.parametrize('pivot', QUICK_SORT_PIVOTS)
+@pytest.mark.parametrize('partition', QUICK_SORT_PARTITIONS)
+def test_quick_sort_strategies_sort(pivot, partition):
+    data = sample()
+    steps = quick_sort_steps(data.copy(), pivot=pivot, partition_scheme=partition, seed=1)
+    assert steps[-1]['array'] == sorted(data)
+
+def test_random_pivot_is_reproducible():
+    first = quick_sort_steps(sample(), pivot='random', seed=3)
+    assert first == quick_sort_steps(sample(), pivot='random', seed=3)
+
+def test_three_way_partition_settles_equal_keys_at_once():
+    steps = quick_sort_steps([4] * 10, partition_scheme='3way')
+    placed = [step for step in steps if step['type'] == 'pivot_place']
+    assert [step['equal_range'] for step in placed] == [[0, 9]]
+    assert not any(step['type'] == 'swap' for step in steps)
+
+def test_smaller_partition_is_sorted_first():
+    steps = quick_sort_steps(sample(200))
+    ranges = [(step['low'], step['high']) for step in steps if step['type'] == 'select_pivot']
+    pivots = [step['pivot_final_index'] for step in steps if step['type'] == 'pivot_place']
+    for (low, high), pivot, following in zip(ranges, pivots, ranges[1:]):
+        left, right = (low, pivot - 1), (pivot + 1, high)
+        if left[1] > left[0] and right[1] > right[0]:
+            smaller = min(left, right, key=lambda side: side[1] - side[0])
+            assert following[1] - following[0] == smaller[1] - smaller[0]
+
+@pytest.mark.parametrize('sort_steps', [heap_sort_steps, shell_sort_steps, counting_sort_steps,
+                                        radix_sort_steps])
+@pytest.mark.parametrize('data', [sample(), [5, -3, 0, -3, 12, 7], [1], []])
+def test_linear_and_in_place_sorts(sort_steps, data):
+    assert sort_steps(data.copy())[-1]['array'] == sorted(data)
+
+@pytest.mark.parametrize('detail', SORT_DETAIL_LEVELS)
+def test_detail_levels_keep_the_result(detail):
+    data = sample()
+    for sort_steps in (heap_sort_steps, shell_sort_steps, counting_sort_steps, radix_sort_steps):
+        assert sort_steps(data.copy(), detail=detail)[-1]['array'] == sorted(data)
+
+@pytest.mark.parametrize('gaps', SHELL_SORT_GAPS)
+def test_shell_sort_gap_sequences(gaps):
+    data = sample(300)
+    assert shell_sort_steps(data.copy(), gaps=gaps)[-1]['array'] == sorted(data)
+
+def test_radix_sort_bases():
+    data = [170, 45, 75, -90, 802, 24, 2, 66]
+    for base in (2, 10, 16):
+        assert radix_sort_steps(data.copy(), base=base)[-1]['array'] == sorted(data)
@@ -0,0 +1,18 @@
+def test_unseeded_random_inputs_are_not_replayed(client, monkeypatch):
+    from app import app
+    monkeypatch.setitem(app.config, 'TRACE_SPILL_MIN_STEPS', 1)
+    arrays = {tuple(client.get('/api/sort/bubble?generate=random&size=50').get_json()['steps'][0]['array'])
+              for _ in range(3)}
+    assert len(arrays) > 1
+
+def test_seeded_inputs_are_stored(client, monkeypatch):
+    from app import app
+    from routes import TraceStore, trace_store
+    monkeypatch.setitem(app.config, 'TRACE_SPILL_MIN_STEPS', 1)
+    url = '/api/sort/quick?data=5,3,9,1&pivot=random&seed=7'
+    first = client.get(url).get_json()
+    stored = trace_store.open(TraceStore.key('/api/sort/quick', [('data', '5,3,9,1'), ('pivot', 'random'),
+                                                                 ('seed', '7')]))
+    assert stored is not None
+    stored.close()
+    assert client.get(url).get_json() == first
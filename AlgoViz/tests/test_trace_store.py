@@ -0,0 +1,26 @@
+import os
+import time
+
+from trace_store import TraceStore
+
+def test_key_distinguishes_encoded_separators():
+    assert TraceStore.key('/api/sort/bubble', [('a', '1&b=2')]) != \
+        TraceStore.key('/api/sort/bubble', [('a', '1'), ('b', '2')])
+
+def test_key_ignores_argument_order():
+    assert TraceStore.key('/p', [('a', '1'), ('b', '2')]) == TraceStore.key('/p', [('b', '2'), ('a', '1')])
+
+def test_evict_drops_oldest_traces_with_their_sidecars(tmp_path):
+    store = TraceStore(str(tmp_path), ttl=3600, max_bytes=10 ** 9)
+    for index, key in enumerate(('old', 'new')):
+        store.put(key, [{'step': i} for i in range(100)], {}).close()
+        with open(store.path(key) + '.gz', 'wb') as file:
+            file.write(b'x' * 100)
+        stamp = time.time() - 100 + index
+        os.utime(store.path(key), (stamp, stamp))
+    with open(os.path.join(tmp_path, 'orphan.trace.gz'), 'wb') as file:
+        file.write(b'x')
+
+    store.max_bytes = os.path.getsize(store.path('new')) + 100
+    store.evict()
+    assert sorted(os.listdir(tmp_path)) == ['new.trace', 'new.trace.gz']
@@ -0,0 +1,188 @@
+"""On-disk store for large step traces
+
+A trace file holds the steps as JSON records behind a fixed-record index so
+any slice can be served straight from a memory map without parsing:
+
+    header   <4sIQI   magic, format version, step count, meta length
+    meta     JSON object with the rest of the response (complexity, ...)
+    index    <QI      per step: offset into the data section, record length
+    data     records separated by commas, so a run of steps is one slice
+
+Files are written to a temporary name and renamed into place, so several
+gunicorn workers can share one directory. Compressed response bodies are
+cached next to the trace as <key>.trace.<suffix>. Entries expire after a TTL
+and the oldest are evicted once the directory grows past a size limit.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from urllib.parse import urlencode
+
+HEADER = struct.Struct('<4sIQI')
+INDEX_RECORD = struct.Struct('<QI')
+MAGIC = b'AVTR'
+FORMAT_VERSION = 1
+
+def encode_json(value):
+    """Compact JSON with sorted keys, matching Flask's jsonify output"""
+    return json.dumps(value, separators=(',', ':'), sort_keys=True).encode()
+
+class TraceFile:
+    """Read-only memory-mapped view of one stored trace"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, meta_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f'Not a trace file: {path}')
+        self.meta = json.loads(self._map[HEADER.size:HEADER.size + meta_length])
+        self._index_start = HEADER.size + meta_length
+        self._data_start = self._index_start + self.count * INDEX_RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def _record(self, position):
+        return INDEX_RECORD.unpack_from(self._map, self._index_start + position * INDEX_RECORD.size)
+
+    def slice_json(self, start, stop):
+        """JSON array bytes for steps[start:stop]"""
+        start, stop, _ = slice(start, stop).indices(self.count)
+        if start >= stop:
+            return b'[]'
+        first, _ = self._record(start)
+        last, length = self._record(stop - 1)
+        return b'[' + self._map[self._data_start + first:self._data_start + last + length] + b']'
+
+    def response_json(self):
+        """The full response body: {"steps": [...], **meta}"""
+        body = b'{"steps":' + self.slice_json(0, self.count)
+        if self.meta:
+            return body + b',' + encode_json(self.meta)[1:]
+        return body + b'}'
+
+class TraceStore:
+    """Directory of trace files keyed by request, with TTL and size eviction"""
+
+    def __init__(self, directory, ttl=3600, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(path, args):
+        """Stable key for a request path and its (name, value) query arguments"""
+        query = urlencode(sorted(args))
+        digest = hashlib.sha256(f'{FORMAT_VERSION}:{path}?{query}'.encode())
+        return digest.hexdigest()[:32]
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.trace')
+
+    def encoded_body(self, key, trace, suffix, compress):
+        """Compressed full response body, cached on disk beside the trace"""
+        path = self.path(key) + suffix
+        try:
+            if os.path.getmtime(path) >= os.path.getmtime(trace.path):
+                with open(path, 'rb') as file:
+                    return file.read()
+        except OSError:
+            pass
+        body = compress(trace.response_json())
+        self._write(path, body)
+        return body
+
+    def _write(self, path, *chunks):
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as file:
+            for chunk in chunks:
+                file.write(chunk)
+        os.replace(temp_path, path)
+
+    def open(self, key):
+        """Return the TraceFile for key, or None if it is missing or expired"""
+        path = self.path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            return TraceFile(path)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, steps, meta):
+        """Write steps (and the rest of the response) to disk and open the result"""
+        records = [encode_json(step) for step in steps]
+        meta_bytes = encode_json(meta)
+        index = bytearray(len(records) * INDEX_RECORD.size)
+        offset = 0
+        for position, record in enumerate(records):
+            INDEX_RECORD.pack_into(index, position * INDEX_RECORD.size, offset, len(record))
+            offset += len(record) + 1
+
+        self._write(self.path(key),
+                    HEADER.pack(MAGIC, FORMAT_VERSION, len(records), len(meta_bytes)),
+                    meta_bytes, index, b','.join(records))
+
+        # Map before evicting so an oversized trace still serves this request
+        trace = TraceFile(self.path(key))
+        self.evict()
+        return trace
+
+    def evict(self):
+        """Drop expired traces, then the oldest ones until under max_bytes
+
+        Sizes include the compressed bodies cached beside each trace; the
+        directory is scanned once per pass.
+        """
+        now = time.time()
+        traces = {}  # key -> [trace mtime, total size, file paths]
+        for entry in os.scandir(self.directory):
+            key, marker, _ = entry.name.partition('.trace')
+            if not marker:
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            record = traces.setdefault(key, [None, 0, []])
+            if entry.name == key + '.trace':
+                record[0] = stat.st_mtime
+            record[1] += stat.st_size
+            record[2].append(entry.path)
+
+        entries = []
+        for mtime, size, paths in traces.values():
+            # Sidecars whose trace is gone are dropped as well
+            if mtime is None or now - mtime > self.ttl:
+                self._remove(paths)
+            else:
+                entries.append((mtime, size, paths))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, paths in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(paths)
+            total -= size
+
+    def _remove(self, paths):
+        """Remove a trace together with its cached compressed bodies"""
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,81 @@
+"""Preset trace cache warmed at startup
+
+The default inputs of every visualizer page are rendered once, serialized,
+and kept (with their compressed variants) in PRESET_CACHE, keyed like the
+trace store. With gunicorn's preload_app this runs in the master before
+fork, so every worker shares the cached bodies copy-on-write and answers
+preset requests without generating anything.
+
+Set WARM_PRESETS_FILE to a file with one API URL per line to replace the
+default preset list, or WARM_CACHE=0 to skip warming.
+"""
+import gc
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from registry import algorithm_names
+from trace_store import TraceStore
+from assets import available_encodings, compress
+
+# key -> {None: body, 'gzip': body, ...}
+PRESET_CACHE = {}
+
+DEFAULT_ARRAY = '64,34,25,12,22,11,90'
+DEFAULT_TREE = '1,2,3,4,5,6,7'
+DEFAULT_GRAPH = {'edges': '0-1,0-2,1-3,2-3,3-4', 'nodes': 5, 'start': 0, 'scope': 'start'}
+RECURSION_MAX_N = 10  # numberInput max on the recursion page
+
+# Extra query parameters the sorting page always sends for some algorithms
+SORTING_PAGE_OPTIONS = {
+    'merge': {'variant': 'topdown'},
+    'shell': {'gaps': 'ciura'},
+    'quick': {'pivot': 'last', 'partition': 'lomuto'},
+}
+
+def default_presets():
+    """API URLs requested by the visualizer pages with their default inputs"""
+    urls = []
+    for algorithm in algorithm_names('sorting'):
+        params = {'data': DEFAULT_ARRAY, **SORTING_PAGE_OPTIONS.get(algorithm, {})}
+        urls.append(f'/api/sort/{algorithm}?{urlencode(params)}')
+        urls.append(f'/api/sort/{algorithm}')
+    for traversal in algorithm_names('trees'):
+        urls.append(f'/api/tree/traversal/{traversal}?{urlencode({"tree": DEFAULT_TREE})}')
+    for algorithm in algorithm_names('recursion'):
+        if algorithm == 'reverse':
+            urls.append('/api/recursion/reverse?text=hello')
+        else:
+            urls.extend(f'/api/recursion/{algorithm}?n={n}' for n in range(1, RECURSION_MAX_N + 1))
+    for algorithm in ('bfs', 'dfs'):
+        urls.append(f'/api/graph/{algorithm}?{urlencode(DEFAULT_GRAPH)}')
+        urls.append(f'/api/graph/{algorithm}')
+    return urls
+
+def load_presets(path):
+    """Read one URL per line, skipping blanks and # comments"""
+    with open(path) as file:
+        return [line.strip() for line in file if line.strip() and not line.startswith('#')]
+
+def preset_key(url):
+    parts = urlsplit(url)
+    args = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if name != 'spill']
+    return TraceStore.key(parts.path, args)
+
+def warm_preset_cache(app, urls):
+    """Render each preset through the app and cache its serialized bodies"""
+    client = app.test_client()
+    for url in urls:
+        response = client.get(url, headers={'Accept-Encoding': 'identity'})
+        if response.status_code != 200 or response.mimetype != 'application/json':
+            app.logger.warning('Skipping preset %s (status %s)', url, response.status_code)
+            continue
+        body = response.get_data()
+        bodies = {None: body}
+        for encoding in available_encodings():
+            bodies[encoding] = compress(body, encoding, best=True)
+        PRESET_CACHE[preset_key(url)] = bodies
+
+    # Keep the collector from touching (and un-sharing) the warmed pages
+    gc.collect()
+    gc.freeze()
+    app.logger.info('Warmed %d preset traces', len(PRESET_CACHE))